@@ -1,11 +1,12 @@
 import numpy as np
 
 from methods.derivation_methods import DerivationMethod
+from methods.evaluation import EvaluationContext
 from methods.gradient_methods import fletcher_reeves, Modification, TerminationCriterion
 from methods.interval_methods import dsk_powell, golden_section
 from research import no_constraints
 from research import with_constraints
-from research.utils import call_counter
+from output.trajectory import TrajectoryRecorder, RecordLevel
 
 # === TARGET FUNCTION ===
 X0 = np.array((-1.2, 0), dtype=np.float64)
@@ -13,7 +14,6 @@ REAL_TARGET_X = np.array((1, 1), dtype=np.float64)
 REAL_TARGET_F = 0
 
 
-@call_counter
 def root_func(x1, x2):
     return (10 * (x1 - x2) ** 2 + (x1 - 1) ** 2) ** (1/4)
 
@@ -32,11 +32,11 @@ def main():
 
     print(params)
 
-    output = []
-    root_func.calls = 0
-    x, f = fletcher_reeves(root_func, X0, **params, output_receiver=lambda **kwargs: output.append(kwargs))
+    recorder = TrajectoryRecorder(RecordLevel.SUMMARY)
+    context = EvaluationContext()
+    x, f = fletcher_reeves(root_func, X0, **params, context=context, output_receiver=recorder)
     print('NO CONSTRAINTS BEST RESULT:')
-    print('X: (%.8f; %.8f), F: %.8f, iterations: %i, calls: %i\n' % (x[0], x[1], f, output[-1]['iter_n'], root_func.calls))
+    print('X: (%.8f; %.8f), F: %.8f, iterations: %i, calls: %i\n' % (x[0], x[1], f, recorder.iter_n[-1], context.target_calls))
 
     params = {
         'derivation_method': DerivationMethod.SYM_DIFF, 'derivation_h': 0.1,
@@ -1,36 +1,214 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
 from typing import Callable
-from copy import deepcopy
 from enum import Enum
 
 import numpy as np
 
+from methods.dual_numbers import dual_gradient
+from methods.evaluation import unwrap
+
 
 class DerivationMethod(Enum):
     RIGHT_DIFF = 'right'
     LEFT_DIFF = 'left'
     SYM_DIFF = 'sym'
+    RICHARDSON = 'richardson'  # symmetric differences with steps h and 2h, extrapolated
+    ADAPTIVE = 'adaptive'  # step is chosen per coordinate, h is only the pilot step
+    DUAL = 'dual'  # exact, forward-mode automatic differentiation (h is only used by the fallback, see nabla)
+
+
+EPS = np.finfo(np.float64).eps
+DUAL_FALLBACK_H = np.cbrt(EPS)  # balances the truncation and roundoff errors of symmetric differences
+
+
+def nabla(
+        func: Callable, x0: np.ndarray, h: float, method = DerivationMethod.SYM_DIFF, f0 = None,
+        batched: bool = False, executor: Executor = None
+) -> np.ndarray:
+    """
+    :param func: Target function
+    :param x0: Point to calculate the gradient at
+    :param h: Step (pilot step for the adaptive method; for DUAL only used by the symmetric difference
+        fallback, if the exact gradient is not finite, DUAL_FALLBACK_H if h <= 0)
+    :param method: Finite difference scheme
+    :param f0: f(x0), if already known
+    :param batched: Evaluate all the perturbed points with a single vectorized call
+        (func must accept arrays of coordinates, as NumPy ufunc expressions do)
+    :param executor: Evaluate the perturbed points concurrently in a thread or process pool
+        (for a process pool func must be picklable, i.e. defined at module level)
+    :return: Gradient approximation
+    """
+
+    if method == DerivationMethod.DUAL:
+        gradient = dual_gradient(func, x0)
+        if np.all(np.isfinite(gradient)):
+            return gradient
+        # E.g. the derivative of a root at its zero (0 ** -0.75) - fall back to finite differences
+        method = DerivationMethod.SYM_DIFF
+        if h <= 0:
+            h = DUAL_FALLBACK_H
+
+    steps = h * np.eye(len(x0))
+
+    if method == DerivationMethod.LEFT_DIFF:
+        points = x0 - steps
+    elif method == DerivationMethod.RIGHT_DIFF:
+        points = x0 + steps
+    elif method == DerivationMethod.SYM_DIFF:
+        points = np.concatenate((x0 + steps, x0 - steps))
+    else:
+        points = np.concatenate((x0 + steps, x0 - steps, x0 + 2 * steps, x0 - 2 * steps))
+
+    if method not in (DerivationMethod.SYM_DIFF, DerivationMethod.RICHARDSON) and f0 is None:
+        points = np.concatenate((points, x0[np.newaxis]))
+
+    fs = _evaluate(func, points, batched, executor)
 
+    if method in (DerivationMethod.RICHARDSON, DerivationMethod.ADAPTIVE):
+        n = len(x0)
+        d1 = (fs[:n] - fs[n:2*n]) / 2 / h
+        d2 = (fs[2*n:3*n] - fs[3*n:4*n]) / 4 / h
+        richardson = (4 * d1 - d2) / 3
 
-def nabla(func: Callable, x0: np.ndarray, h: float, method = DerivationMethod.SYM_DIFF, f0 = None) -> np.ndarray:
-    result = np.zeros_like(x0)
-
-    if method != DerivationMethod.SYM_DIFF and f0 is None:
-        f0 = func(*x0)
-
-    for i in range(len(x0)):
-        if method == DerivationMethod.LEFT_DIFF:
-            tmp = deepcopy(x0)
-            tmp[i] = tmp[i] - h
-            result[i] = (f0 - func(*tmp)) / h
-        elif method == DerivationMethod.RIGHT_DIFF:
-            tmp = deepcopy(x0)
-            tmp[i] = tmp[i] + h
-            result[i] = (func(*tmp) - f0) / h
-        else:
-            tmp1 = deepcopy(x0)
-            tmp1[i] = tmp1[i] + h
-            tmp2 = deepcopy(x0)
-            tmp2[i] = tmp2[i] - h
-            result[i] = (func(*tmp1) - func(*tmp2)) / 2 / h
+        if method == DerivationMethod.RICHARDSON:
+            return richardson
+
+        if f0 is None:
+            f0 = fs[-1]
+        return _adaptive(func, x0, f0, h, fs, richardson, batched, executor)
+
+    if method == DerivationMethod.LEFT_DIFF:
+        if f0 is None:
+            f0 = fs[-1]
+        return (f0 - fs[:len(x0)]) / h
+    elif method == DerivationMethod.RIGHT_DIFF:
+        if f0 is None:
+            f0 = fs[-1]
+        return (fs[:len(x0)] - f0) / h
+    else:
+        return (fs[:len(x0)] - fs[len(x0):]) / 2 / h
+
+
+def _adaptive(func, x0, f0, h, fs, richardson, batched, executor):
+    # Third derivatives from the pilot stencil (x0 ± h, x0 ± 2h)
+    n = len(x0)
+    f3 = (fs[2*n:3*n] - 2 * fs[:n] + 2 * fs[n:2*n] - fs[3*n:4*n]) / 2 / h ** 3
+
+    # Step that balances the truncation error h^2 |f'''| / 6 and the roundoff error eps_f / h
+    eps_f = EPS * max(abs(f0), EPS)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        h_opt = np.cbrt(3 * eps_f / np.abs(f3))
+
+    # Where the pilot step is already close to optimal (or f''' vanishes), reuse the pilot stencil
+    refine = np.isfinite(h_opt) & ((h_opt < h / 2) | (h_opt > 2 * h))
+    if not np.any(refine):
+        return richardson
+
+    result = richardson.copy()
+    idx = np.flatnonzero(refine)
+    steps = np.zeros((len(idx), n))
+    steps[np.arange(len(idx)), idx] = h_opt[idx]
+
+    fs_opt = _evaluate(func, np.concatenate((x0 + steps, x0 - steps)), batched, executor)
+    result[idx] = (fs_opt[:len(idx)] - fs_opt[len(idx):]) / 2 / h_opt[idx]
 
     return result
+
+
+def _evaluate(func, points, batched, executor):
+    if executor is not None:
+        if isinstance(executor, ProcessPoolExecutor):
+            func = unwrap(func, len(points))  # the evaluations are counted here, in the parent process
+        return np.fromiter(executor.map(func, *points.T), dtype=np.float64, count=len(points))
+    if batched:
+        return np.asarray(func(*points.T), dtype=np.float64)
+    return np.array([func(*p) for p in points], dtype=np.float64)
+
+
+def nabla_lockstep(
+        func: Callable, xs: np.ndarray, h: float, method = DerivationMethod.SYM_DIFF, fs: np.ndarray = None
+) -> np.ndarray:
+    """
+    Gradients at k points at once, all the perturbed points are evaluated with a single vectorized call.
+
+    :param func: Target function (must accept arrays of coordinates)
+    :param xs: k x n array of the points
+    :param h: Step
+    :param method: Finite difference scheme (LEFT_DIFF, RIGHT_DIFF or SYM_DIFF)
+    :param fs: f(xs), if already known
+    :return: k x n array of the gradient approximations
+    """
+
+    k, n = xs.shape
+    steps = h * np.eye(n)
+
+    if method == DerivationMethod.LEFT_DIFF:
+        stencil = xs[:, np.newaxis] - steps
+    elif method == DerivationMethod.RIGHT_DIFF:
+        stencil = xs[:, np.newaxis] + steps
+    elif method == DerivationMethod.SYM_DIFF:
+        stencil = np.concatenate((xs[:, np.newaxis] + steps, xs[:, np.newaxis] - steps), axis=1)
+    else:
+        raise ValueError('Unsupported derivation method')
+
+    if method != DerivationMethod.SYM_DIFF and fs is None:
+        stencil = np.concatenate((stencil, xs[:, np.newaxis]), axis=1)
+
+    values = _evaluate(func, stencil.reshape(-1, n), True, None).reshape(k, -1)
+
+    if method == DerivationMethod.LEFT_DIFF:
+        if fs is None:
+            fs = values[:, -1]
+        return (fs[:, np.newaxis] - values[:, :n]) / h
+    elif method == DerivationMethod.RIGHT_DIFF:
+        if fs is None:
+            fs = values[:, -1]
+        return (values[:, :n] - fs[:, np.newaxis]) / h
+    else:
+        return (values[:, :n] - values[:, n:]) / 2 / h
+
+
+def nabla_hessian(
+        func: Callable, x0: np.ndarray, h: float, f0 = None,
+        batched: bool = False, executor: Executor = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Gradient and Hessian by symmetric differences. All 2n^2 (+1) stencil points are evaluated together,
+    with a single vectorized call if batched.
+
+    :param func: Target function
+    :param x0: Point to calculate the derivatives at
+    :param h: Step
+    :param f0: f(x0), if already known
+    :param batched: Evaluate all the stencil points with a single vectorized call
+    :param executor: Evaluate the stencil points concurrently in a thread or process pool
+    :return: Gradient and Hessian approximations
+    """
+
+    n = len(x0)
+    steps = h * np.eye(n)
+    i, j = np.triu_indices(n, k=1)
+
+    points = [
+        x0 + steps, x0 - steps,
+        x0 + steps[i] + steps[j], x0 + steps[i] - steps[j],
+        x0 - steps[i] + steps[j], x0 - steps[i] - steps[j]
+    ]
+    if f0 is None:
+        points.append(x0[np.newaxis])
+
+    fs = _evaluate(func, np.concatenate(points), batched, executor)
+    if f0 is None:
+        f0 = fs[-1]
+
+    m = len(i)
+    f_plus, f_minus = fs[:n], fs[n:2*n]
+    f_pp, f_pm, f_mp, f_mm = (fs[2*n + k*m:2*n + (k+1)*m] for k in range(4))
+
+    gradient = (f_plus - f_minus) / 2 / h
+
+    hessian = np.empty((n, n))
+    hessian[np.diag_indices(n)] = (f_plus - 2 * f0 + f_minus) / h ** 2
+    hessian[i, j] = hessian[j, i] = (f_pp - f_pm - f_mp + f_mm) / 4 / h ** 2
+
+    return gradient, hessian
@@ -0,0 +1,164 @@
+from collections import OrderedDict
+from numbers import Real
+from threading import Lock
+from typing import Callable
+
+import numpy as np
+
+
+class EvaluationContext:
+    """
+    Evaluation accounting of a single run: calls of the target function and of the constraints,
+    and cache hits. Vectorized calls count every evaluated point. Safe to share between threads;
+    evaluations in a process pool are counted in the parent process.
+    """
+
+    def __init__(self):
+        self.target_calls = 0
+        self.constraint_calls = 0
+        self.cache_hits = 0
+        self._lock = Lock()
+
+    def count_target(self, n: int = 1):
+        with self._lock:
+            self.target_calls += n
+
+    def count_constraints(self, n: int = 1):
+        with self._lock:
+            self.constraint_calls += n
+
+    def count_cache_hit(self):
+        with self._lock:
+            self.cache_hits += 1
+
+    def target(self, func: Callable) -> Callable:
+        """
+        :return: func, counted as the target function (unless it is already counted by this context)
+        """
+
+        if getattr(func, 'context', None) is self:
+            return func
+        return ContextFunction(func, self)
+
+
+class ContextFunction:
+    """
+    Target function that counts its calls in an evaluation context
+    """
+
+    def __init__(self, func: Callable, context: EvaluationContext):
+        self.func = func
+        self.context = context
+
+    def __call__(self, *args):
+        self.context.count_target(_points(args))
+        return self.func(*args)
+
+    def count(self, n: int):
+        self.context.count_target(n)
+
+
+class CachedFunction:
+    """
+    Bounded LRU cache of the target function values, keyed on the exact point.
+    Calls with non-scalar arguments (arrays, dual numbers) bypass the cache.
+    """
+
+    def __init__(self, func: Callable, maxsize: int = 1024, context: EvaluationContext = None):
+        self.func = func
+        self.maxsize = maxsize
+        self.context = context
+        self.hits = 0
+        self.misses = 0
+        self._values = OrderedDict()
+        self._lock = Lock()
+
+    def __call__(self, *args):
+        if not all(isinstance(a, Real) for a in args):
+            return self.func(*args)
+
+        key = tuple(float(a) for a in args)
+
+        with self._lock:
+            if key in self._values:
+                self.hits += 1
+                if self.context is not None:
+                    self.context.count_cache_hit()
+                self._values.move_to_end(key)
+                return self._values[key]
+
+        value = self.func(*args)
+
+        with self._lock:
+            self.misses += 1
+            self._values[key] = value
+            if len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class CountedFunction:
+    """
+    Counts evaluations of the target function. Vectorized calls count every evaluated point.
+    Safe to call from several threads (e.g. with a thread pool derivation executor).
+    """
+
+    def __init__(self, func: Callable, evaluations: int = 0):
+        self.func = func
+        self.evaluations = evaluations
+        self._lock = Lock()
+
+    def __call__(self, *args):
+        self.count(_points(args))
+        return self.func(*args)
+
+    def count(self, n: int):
+        with self._lock:
+            self.evaluations += n
+
+
+class ContextCountedFunction(CountedFunction):
+    """
+    CountedFunction, whose evaluations are the target calls of an evaluation context. So the calls of the target
+    function made outside of func (e.g. by a finite-difference gradient of a part of it) are counted as well.
+    """
+
+    def __init__(self, func: Callable, context: EvaluationContext):
+        self.func = func
+        self.context = context
+
+    @property
+    def evaluations(self) -> int:
+        return self.context.target_calls
+
+    def count(self, n: int):
+        pass  # the calls of the target function are counted by the context
+
+
+def _points(args) -> int:
+    """
+    :return: Number of points in a call with the given arguments
+    """
+
+    return np.size(args[0]) if isinstance(args[0], np.ndarray) else 1
+
+
+def unwrap(func: Callable, n: int) -> Callable:
+    """
+    Counts n evaluations in every counting wrapper of func and returns the innermost function,
+    e.g. to send it to a process pool (the cache and the counters are not shared between processes)
+    """
+
+    while isinstance(func, (ContextFunction, CachedFunction, CountedFunction)):
+        if hasattr(func, 'count'):
+            func.count(n)
+        func = func.func
+
+    return func
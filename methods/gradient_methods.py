@@ -1,16 +1,20 @@
+from concurrent.futures import Executor
 from typing import Callable
 from enum import Enum
 
 import numpy as np
 
-from methods.derivation_methods import DerivationMethod, nabla
-from methods.interval_methods import sven
+from methods.derivation_methods import DerivationMethod, nabla, nabla_lockstep
+from methods.evaluation import CachedFunction, CountedFunction, EvaluationContext
+from methods.interval_methods import sven, sven_vectorized, sven_lockstep, golden_section_lockstep
+from methods.termination import TerminationPolicy
 
 
 # =======================================================================================
 class TerminationCriterion(Enum):
     X_AND_F_CHANGE = 1
     S_NORM = 2
+    NABLA_NORM = 3
 
 
 class Modification(Enum):
@@ -18,8 +22,133 @@ class Modification(Enum):
     POLAK_RIBIERE = 'polak_ribiere'
 
 
-def get_func_of_lambda(func: Callable, x_prev: np.array, s: np.array):
-    return lambda lamb: func(*(x_prev + lamb * s))
+def get_func_of_lambda(func: Callable, x_prev: np.array, s: np.array, out: np.array = None, vectorized: bool = False):
+    """
+    :param out: Buffer for the trial points; if given, no arrays are allocated per evaluation
+    :param vectorized: Accept an array of lambdas and evaluate all the trial points with a single call
+        (func must accept arrays of coordinates)
+    """
+
+    if vectorized:
+        return lambda lamb: func(*np.moveaxis(x_prev + np.multiply.outer(lamb, s), -1, 0))
+
+    if out is None:
+        return lambda lamb: func(*(x_prev + lamb * s))
+
+    def func_lamb(lamb):
+        np.multiply(s, lamb, out=out)
+        np.add(out, x_prev, out=out)
+        return func(*out)
+
+    return func_lamb
+
+
+def get_derivative_of_lambda(grad: Callable, x_prev: np.array, s: np.array):
+    """
+    :param grad: Function of (x, f(x)) that calculates the gradient
+    :return: Directional derivative as a function of lambda. The last calculated gradient is kept
+        in its "last" attribute as (lambda, gradient), so it can be reused at the accepted point
+    """
+
+    def derivative(lamb):
+        nabla_lamb = grad(x_prev + lamb * s, None)
+        derivative.last = (lamb, nabla_lamb)
+        return np.inner(nabla_lamb, s)
+
+    derivative.last = None
+    return derivative
+
+
+def get_lambda_bounds(max_step: Callable, x: np.ndarray, s: np.ndarray):
+    """
+    :param max_step: Feasible step length of the target function (its "max_step" attribute, e.g. of an interior
+        barrier), or None
+    :return: (low, high) - bounds of lambda for sven, so the trial points stay feasible (None if there are none)
+    """
+
+    if max_step is None:
+        return None
+    return -max_step(x, -s), max_step(x, s)
+
+
+def get_finite_direction(s: np.ndarray, nabla: np.ndarray):
+    """
+    :return: s, or the antigradient if s is not finite (e.g. it has overflowed), or None if neither is finite
+        (e.g. a finite-difference stencil has left the feasible region of an interior barrier)
+    """
+
+    if np.all(np.isfinite(s)):
+        return s
+    if np.all(np.isfinite(nabla)):
+        return -nabla
+    return None
+
+
+def get_gradient_func(
+        func: Callable, gradient: Callable,
+        derivation_method: DerivationMethod, derivation_h: float,
+        derivation_batched: bool = False, derivation_executor: Executor = None
+):
+    """
+    :param func: Target function
+    :param gradient: Explicit gradient of the target function (called as gradient(*x)), or None
+    :return: Function of (x, f(x)) that calculates the gradient
+    """
+
+    if gradient is not None:
+        return lambda x, f: np.asarray(gradient(*x), dtype=np.float64)
+
+    return lambda x, f: nabla(
+        func, x, derivation_h, derivation_method, f0=f,
+        batched=derivation_batched, executor=derivation_executor
+    )
+
+
+def get_counted_func(func: Callable, termination_policy: TerminationPolicy):
+    """
+    :return: func, wrapped to count evaluations if a termination policy is used, and the counter (or None)
+    """
+
+    if termination_policy is None:
+        return func, None
+
+    termination_policy.reset()
+
+    if isinstance(func, CountedFunction):
+        return func, func
+
+    counted = CountedFunction(func)
+    return counted, counted
+
+
+def check_termination(
+        termination_criterion: TerminationCriterion, accuracy: float,
+        x0: np.ndarray, x1: np.ndarray, f0: float, f1: float, s: np.ndarray, nabla1: np.ndarray,
+        dx: np.ndarray = None
+) -> bool:
+    """
+    :param x0, f0: Previous point and function value
+    :param x1, f1: Next point and function value
+    :param s: Search direction that led from x0 to x1
+    :param nabla1: Gradient at x1
+    :param dx: Buffer for x1 - x0
+    """
+
+    if termination_criterion is None:
+        return False
+    elif termination_criterion == TerminationCriterion.X_AND_F_CHANGE:
+        # print(f1, f0)
+        x0_norm = np.linalg.norm(x0)
+        if x0_norm == 0:
+            return False
+        dx = np.subtract(x1, x0, out=dx)
+        return np.linalg.norm(dx) / x0_norm <= accuracy and abs(f1 - f0) <= accuracy
+    elif termination_criterion == TerminationCriterion.S_NORM:
+        return np.linalg.norm(s) <= accuracy
+    elif termination_criterion == TerminationCriterion.NABLA_NORM:
+        return np.linalg.norm(nabla1) <= accuracy
+    else:
+        raise ValueError('Unknown termination criterion')
 
 
 # =======================================================================================
@@ -31,14 +160,68 @@ def fletcher_reeves(
         modification: Modification, termination_criterion: TerminationCriterion, accuracy: float,
         restart_lambda_threshold: float = -1,
         max_iter: int = -1,
+        derivation_batched: bool = False,
+        derivation_executor: Executor = None,
+        gradient: Callable = None,
+        cache_size: int = 0,
+        warm_start_lambda: bool = False,
+        lambda_expansion: float = 2,
+        lambda_vectorized: bool = False,
+        initial_direction: np.ndarray = None,
+        initial_lambda: float = None,
+        termination_policy: TerminationPolicy = None,
+        context: EvaluationContext = None,
         output_receiver: Callable = None
 ):
+    """
+    :param warm_start_lambda: Start each line search from the previous optimal step, scaled by the change
+        of the gradient norm (delta_lambda is used only for the first one)
+    :param lambda_expansion: Step multiplier of the Sven method
+    :param lambda_vectorized: Evaluate the trial lambdas in batches with single vectorized calls
+        (func must accept arrays of coordinates; use with e.g. grid_refinement as the lambda_method)
+    :param initial_direction: First search direction, e.g. carried over from a previous search
+        (ignored if it is not a descent direction at x0)
+    :param initial_lambda: First trial step along initial_direction (instead of delta_lambda)
+    :param termination_policy: Checked after every iteration in addition to the termination criterion
+        (which may be None), e.g. to limit the number of evaluations or the wall-clock time
+    :param context: Evaluation accounting of the run (calls of func and cache hits)
+    """
+
     if x0.dtype != np.float64:
         raise Warning('Method might not work as expected if the x0 vector consists of non-floats')
 
+    max_step = getattr(func, 'max_step', None)  # feasible step length, e.g. of an interior barrier
+
+    if context is not None:
+        func = context.target(func)
+
+    func, counted = get_counted_func(func, termination_policy)
+
+    if cache_size > 0:
+        func = CachedFunction(func, cache_size, context)
+
+    grad = get_gradient_func(
+        func, gradient, derivation_method, derivation_h, derivation_batched, derivation_executor
+    )
+
+    # Work buffers, updated in place
+    x0 = np.array(x0, dtype=np.float64)
+    x1 = np.empty_like(x0)
+    s0 = np.empty_like(x0)
+    x_lamb = np.empty_like(x0)
+    dx = np.empty_like(x0)
+
     f0 = func(*x0)
-    nabla0 = nabla(func, x0, derivation_h, derivation_method, f0=f0)
-    s0 = -nabla0
+    nabla0 = grad(x0, f0)
+
+    step = delta_lambda
+
+    if initial_direction is not None and np.inner(initial_direction, nabla0) < 0:
+        s0[:] = initial_direction
+        if initial_lambda:
+            step = abs(initial_lambda)
+    else:
+        np.negative(nabla0, out=s0)
 
     iter_n = 0
 
@@ -48,67 +231,202 @@ def fletcher_reeves(
         # print('nabla_prev:', nabla0)
         # print('s_prev:', s0)
 
+        direction = get_finite_direction(s0, nabla0)
+        if direction is None:  # the search cannot continue
+            if output_receiver:
+                output_receiver(iter_n=iter_n, x=x0.copy(), f=f0)
+            return x0, f0
+        np.copyto(s0, direction)
+
+        func_lamb = get_func_of_lambda(func, x0, s0, out=x_lamb, vectorized=lambda_vectorized)
+
+        derivative = None
+
         for i in range(2):
-            func_lamb = get_func_of_lambda(func, x0, s0)
+            if getattr(lambda_method, 'inexact', False):
+                slope = np.inner(nabla0, s0)
+                if slope >= 0:  # not a descent direction - restart
+                    np.negative(nabla0, out=s0)
+                    slope = -np.inner(nabla0, nabla0)
 
-            lambda_opt_x_interval, lambda_opt_f_interval = sven(func_lamb, 0, delta_lambda)
-            lambda_opt, f1 = lambda_method(func_lamb, lambda_opt_x_interval, lambda_opt_f_interval, lambda_accuracy)
+                derivative = get_derivative_of_lambda(grad, x0, s0)
+                lambda_opt, f1 = lambda_method(
+                    func_lamb, f0, slope, step, lambda_accuracy, derivative=derivative
+                )
+                lambda_opt_x_interval = (0, lambda_opt)
+            else:
+                if lambda_vectorized:
+                    lambda_opt_x_interval, lambda_opt_f_interval = sven_vectorized(func_lamb, 0, step, lambda_expansion)
+                else:
+                    lambda_opt_x_interval, lambda_opt_f_interval = sven(
+                        func_lamb, 0, step, lambda_expansion, get_lambda_bounds(max_step, x0, s0)
+                    )
+                lambda_opt, f1 = lambda_method(func_lamb, lambda_opt_x_interval, lambda_opt_f_interval, lambda_accuracy)
 
             # print('lambda:', lambda_opt)
 
             if restart_lambda_threshold < 0 or lambda_opt > restart_lambda_threshold:
                 break
 
-            s0 = -nabla0  # "restart"
+            np.negative(nabla0, out=s0)  # "restart"
 
         if output_receiver:
             output_receiver(
                 iter_n=iter_n,
-                x=x0,
+                x=x0.copy(),
                 f=f0,
                 nabla=nabla0,
-                s=s0,
+                s=s0.copy(),
                 lambda_interval=lambda_opt_x_interval,
                 lambda_opt=lambda_opt
             )
 
-        x1 = x0 + lambda_opt * s0
-        nabla1 = nabla(func, x1, derivation_h, derivation_method, f0=f1)
+        np.multiply(s0, lambda_opt, out=x1)
+        x1 += x0
+
+        if derivative is not None and derivative.last is not None and derivative.last[0] == lambda_opt:
+            nabla1 = derivative.last[1]  # already calculated by the line search
+        else:
+            nabla1 = grad(x1, f1)
 
         # print('\nx_next:', x1)
         # print('nabla_next:', nabla1)
 
-        if termination_criterion == TerminationCriterion.X_AND_F_CHANGE:
-            # print(f1, f0)
-            if np.linalg.norm(x0) == 0:
-                terminate = False
-            else:
-                terminate = np.linalg.norm(x1 - x0) / np.linalg.norm(x0) <= accuracy and abs(f1 - f0) <= accuracy
-        elif termination_criterion == TerminationCriterion.S_NORM:
-            terminate = np.linalg.norm(s0) <= accuracy
-        elif termination_criterion == TerminationCriterion.NABLA_NORM:
-            terminate = np.linalg.norm(nabla1) <= accuracy
-        else:
-            raise ValueError('Unknown termination criterion')
+        terminate = check_termination(termination_criterion, accuracy, x0, x1, f0, f1, s0, nabla1, dx=dx)
+
+        if termination_policy is not None and not terminate:
+            terminate = termination_policy(
+                iter_n=iter_n, x_prev=x0, x=x1, f_prev=f0, f=f1, nabla=nabla1, s=s0, evaluations=counted.evaluations
+            )
 
         if iter_n == max_iter:
             terminate = True
 
         if terminate:
-            output_receiver(iter_n=iter_n+1, x=x1, f=f1)
+            if output_receiver:
+                if cache_size > 0:
+                    output_receiver(iter_n=iter_n+1, x=x1, f=f1, cache_hits=func.hits, cache_misses=func.misses)
+                else:
+                    output_receiver(iter_n=iter_n+1, x=x1, f=f1)
             return x1, f1
 
-        s1 = -nabla1 + _fletcher_reeves_w(nabla0, nabla1, modification) * s0
-        # print('s_next:', s1)
+        # s1 = -nabla1 + w * s0
+        s0 *= _fletcher_reeves_w(nabla0, nabla1, modification)
+        s0 -= nabla1
+        # print('s_next:', s0)
 
-        x0 = x1
+        if warm_start_lambda or getattr(lambda_method, 'warm_start', False):
+            step = _warm_start_step(lambda_opt, np.linalg.norm(nabla0), np.linalg.norm(nabla1), delta_lambda)
+
+        x0, x1 = x1, x0
         f0 = f1
-        s0 = s1
         nabla0 = nabla1
 
         iter_n += 1
 
 
+def fletcher_reeves_multistart(
+        func: Callable,
+        x0s: np.ndarray,
+        derivation_method: DerivationMethod, derivation_h: float,
+        delta_lambda: float, lambda_accuracy: float,
+        modification: Modification, termination_criterion: TerminationCriterion, accuracy: float,
+        max_iter: int = -1,
+        lambda_expansion: float = 2,
+        context: EvaluationContext = None,
+        output_receiver: Callable = None
+):
+    """
+    Runs fletcher_reeves from k starting points in lockstep. Gradients and line search trial points of all
+    the unfinished runs are evaluated with one vectorized call, so func must accept arrays of coordinates.
+    Line searches use Sven and golden section methods.
+
+    :param x0s: k x n array of the starting points
+    :param context: Evaluation accounting of the run (every point of a vectorized call is counted)
+    :return: k x n array of x* and array of f(x*)
+    """
+
+    if context is not None:
+        func = context.target(func)
+
+    x = np.array(x0s, dtype=np.float64)
+    f = np.asarray(func(*x.T), dtype=np.float64)
+    nabla0 = nabla_lockstep(func, x, derivation_h, derivation_method, fs=f)
+    s = -nabla0
+
+    active = np.arange(len(x))
+
+    iter_n = 0
+
+    while active.size:
+        x_prev, s_prev = x[active], s[active]
+
+        def func_lamb(lambdas, lines):
+            return np.asarray(func(*(x_prev[lines] + lambdas[:, np.newaxis] * s_prev[lines]).T), dtype=np.float64)
+
+        lambda_xs, lambda_fs = sven_lockstep(func_lamb, np.zeros(len(active)), delta_lambda, lambda_expansion)
+        lambda_opt, f1 = golden_section_lockstep(func_lamb, lambda_xs, lambda_fs, lambda_accuracy)
+
+        if output_receiver:
+            output_receiver(
+                iter_n=iter_n,
+                starts=active.copy(),
+                x=x_prev,
+                f=f[active],
+                nabla=nabla0[active],
+                s=s_prev,
+                lambda_opt=lambda_opt
+            )
+
+        x1 = x_prev + lambda_opt[:, np.newaxis] * s_prev
+        nabla1 = nabla_lockstep(func, x1, derivation_h, derivation_method, fs=f1)
+
+        if termination_criterion == TerminationCriterion.X_AND_F_CHANGE:
+            x_prev_norm = np.linalg.norm(x_prev, axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                x_change = np.linalg.norm(x1 - x_prev, axis=1) / x_prev_norm
+            terminate = (x_prev_norm != 0) & (x_change <= accuracy) & (np.abs(f1 - f[active]) <= accuracy)
+        elif termination_criterion == TerminationCriterion.S_NORM:
+            terminate = np.linalg.norm(s_prev, axis=1) <= accuracy
+        elif termination_criterion == TerminationCriterion.NABLA_NORM:
+            terminate = np.linalg.norm(nabla1, axis=1) <= accuracy
+        else:
+            raise ValueError('Unknown termination criterion')
+
+        if iter_n == max_iter:
+            terminate[:] = True
+
+        nabla0_active = nabla0[active]
+        norm0 = np.einsum('ij,ij->i', nabla0_active, nabla0_active)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if modification == Modification.FLETCHER_REEVES:
+                w = np.einsum('ij,ij->i', nabla1, nabla1) / norm0
+            elif modification == Modification.POLAK_RIBIERE:
+                w = np.einsum('ij,ij->i', nabla1, nabla1 - nabla0_active) / norm0
+            else:
+                raise ValueError('Unknown modification')
+        w[norm0 == 0] = 0
+
+        x[active], f[active] = x1, f1
+        s[active] = -nabla1 + w[:, np.newaxis] * s_prev
+        nabla0[active] = nabla1
+
+        if output_receiver and np.any(terminate):
+            output_receiver(iter_n=iter_n+1, starts=active[terminate], x=x1[terminate], f=f1[terminate])
+
+        active = active[~terminate]
+        iter_n += 1
+
+    return x, f
+
+
+def _warm_start_step(lambda_prev, nabla_norm_prev, nabla_norm, default):
+    step = abs(lambda_prev) * nabla_norm_prev / nabla_norm if nabla_norm != 0 else 0
+    if not np.isfinite(step) or step == 0:
+        return default
+    return step
+
+
 def _fletcher_reeves_w(nabla0, nabla1, modification):
     if modification == Modification.FLETCHER_REEVES:
         return np.inner(nabla1, nabla1) / np.inner(nabla0, nabla0)
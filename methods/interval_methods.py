@@ -1,5 +1,4 @@
 from typing import Callable
-import warnings
 
 import numpy as np
 
@@ -8,11 +7,14 @@ GOLDEN_SECTION_A = 2 / (3 + np.sqrt(5))
 
 
 # =======================================================================================
-def sven(func: Callable, x0: float, delta0: float):
+def sven(func: Callable, x0: float, delta0: float, expansion: float = 2, bounds: tuple = None):
     """
     :param func: Target unimodal function
     :param x0: Starting point
     :param delta0: Starting step
+    :param expansion: Step multiplier
+    :param bounds: (low, high) - open interval the trial points must stay in (e.g. the feasible region);
+        a step that would leave it goes halfway to the bound instead
     :return:
         (a, (a+b)/2, b) - interval that contains the min point
         (f(a), f((a+b)/2), f(b)) - function values
@@ -21,8 +23,8 @@ def sven(func: Callable, x0: float, delta0: float):
     xs = [x0]
     fs = [func(x0)]
 
-    x_left = x0 - delta0
-    x_right = x0 + delta0
+    x_left = _bounded_step(x0, x0 - delta0, bounds)
+    x_right = _bounded_step(x0, x0 + delta0, bounds)
     f_left = func(x_left)
     f_right = func(x_right)
 
@@ -39,17 +41,23 @@ def sven(func: Callable, x0: float, delta0: float):
         fs.append(f_left)
         delta *= -1
 
+    if bounds is not None:
+        delta = xs[1] - x0
+
     # Move forward
     while True:
-        delta *= 2
+        delta *= expansion
 
         new_x = xs[-1] + delta
+        if bounds is not None:
+            new_x = _bounded_step(xs[-1], new_x, bounds)
+            delta = new_x - xs[-1]
         new_f = func(new_x)
 
         xs.append(new_x)
         fs.append(new_f)
 
-        if fs[-1] >= fs[-2]:
+        if not fs[-1] < fs[-2]:  # also stops at nan
             break
 
     # for i in range(len(xs)):
@@ -73,126 +81,647 @@ def sven(func: Callable, x0: float, delta0: float):
     return tuple(result_xs), tuple(result_fs)
 
 
+def _bounded_step(x_from, x_to, bounds):
+    if bounds is None:
+        return x_to
+    if x_to >= bounds[1]:
+        return x_from + (bounds[1] - x_from) / 2
+    if x_to <= bounds[0]:
+        return x_from + (bounds[0] - x_from) / 2
+    return x_to
+
+
 # =======================================================================================
-def golden_section(func: Callable, xs: tuple, fs: tuple, accuracy: float, max_iter: int = -1):
+def golden_section(
+        func: Callable, xs: tuple, fs: tuple, accuracy: float, max_iter: int = -1, output_receiver: Callable = None
+):
     """
     :param func: Target unimodal function
     :param xs: (a, b) - interval that contains the min point
     :param fs: (f(a), f(b)) - function values
     :param accuracy: Target interval length
     :param max_iter: Iterations limit
+    :param output_receiver: Receives the number of iterations and function evaluations
     :return: x* and f(x*)
     """
 
-    length = xs[-1] - xs[0]
+    a, b = xs[0], xs[-1]
+    fa, fb = fs[0], fs[-1]
+
+    iter_n = 0
+    evaluations = 0
+
+    if b - a > accuracy and max_iter != 0:
+        length = b - a
+        x1 = a + GOLDEN_SECTION_A * length
+        x2 = a + (1 - GOLDEN_SECTION_A) * length
+        f1 = func(x1)
+        f2 = func(x2)
+        evaluations += 2
+
+        while True:
+            # Keep the point with the lower value, it becomes the opposite golden point of the new interval
+            if f1 < f2:
+                b, fb = x2, f2
+                x2, f2 = x1, f1
+                left = True
+            else:
+                a, fa = x1, f1
+                x1, f1 = x2, f2
+                left = False
+
+            iter_n += 1
+            length = b - a
+
+            if length <= accuracy or iter_n == max_iter:
+                break
+
+            if left:
+                x1 = a + GOLDEN_SECTION_A * length
+                f1 = func(x1)
+            else:
+                x2 = a + (1 - GOLDEN_SECTION_A) * length
+                f2 = func(x2)
+            evaluations += 1
+
+    return _interval_result(a, b, fa, fb, iter_n, evaluations, output_receiver)
+
+
+def fibonacci(
+        func: Callable, xs: tuple, fs: tuple, accuracy: float, max_iter: int = -1, output_receiver: Callable = None
+):
+    """
+    Fibonacci search: the optimal number of evaluations for the target interval length is known in advance.
 
-    left_golden_x = xs[0] + GOLDEN_SECTION_A * length
-    right_golden_x = xs[0] + (1 - GOLDEN_SECTION_A) * length
-    left_golden_f = func(left_golden_x)
-    right_golden_f = func(right_golden_x)
+    :param func: Target unimodal function
+    :param xs: (a, b) - interval that contains the min point
+    :param fs: (f(a), f(b)) - function values
+    :param accuracy: Target interval length
+    :param max_iter: Iterations limit
+    :param output_receiver: Receives the number of iterations and function evaluations
+    :return: x* and f(x*)
+    """
 
-    return _golden_section(
-        func,
-        (xs[0], left_golden_x, right_golden_x, xs[-1]),
-        (fs[0], left_golden_f, right_golden_f, fs[-1]),
-        length,
-        accuracy,
-        max_iter,
-        0
-    )
+    a, b = xs[0], xs[-1]
+    fa, fb = fs[0], fs[-1]
 
+    iter_n = 0
+    evaluations = 0
 
-def _golden_section(func, xs, fs, length, accuracy, max_iter=0, iter_n=0):
-    # print('xs: %s;\tfs: %s\tL: %0.3f\titer_n: %i' % (xs, fs, length, iter_n))
+    if b - a > accuracy and max_iter != 0:
+        # The interval shrinks to 2 * L / F_n
+        fib = [1, 1]
+        while fib[-1] < 2 * (b - a) / accuracy:
+            fib.append(fib[-1] + fib[-2])
+        k = len(fib) - 1
 
-    if length <= accuracy:
-        return (xs[0] + xs[-1]) / 2, (fs[0] + fs[-1]) / 2
+        length = b - a
+        x1 = a + fib[k-2] / fib[k] * length
+        x2 = a + fib[k-1] / fib[k] * length
+        f1 = func(x1)
+        f2 = func(x2)
+        evaluations += 2
 
-    if fs[1] < fs[2]:
-        return _golden_section_left(
-            func,
-            xs[0], xs[1], xs[2],
-            fs[0], fs[1], fs[2],
-            accuracy
-        )
-    else:
-        return _golden_section_right(
-            func,
-            xs[1], xs[2], xs[3],
-            fs[1], fs[2], fs[3],
-            accuracy
-        )
-
-
-def _golden_section_left(func, left_x, right_golden_x, right_x, left_f, right_golden_f, right_f, accuracy):
-    length = right_x - left_x
-    left_golden_x = left_x + 0.382 * length
-    left_golden_f = func(left_golden_x)
-    return _golden_section(
-        func,
-        (left_x, left_golden_x, right_golden_x, right_x),
-        (left_f, left_golden_f, right_golden_f, right_f),
-        length,
-        accuracy
-    )
-
-
-def _golden_section_right(func, left_x, left_golden_x, right_x, left_f, left_golden_f, right_f, accuracy):
-    length = right_x - left_x
-    right_golden_x = left_x + 0.618 * length
-    right_golden_f = func(right_golden_x)
-    return _golden_section(
-        func,
-        (left_x, left_golden_x, right_golden_x, right_x),
-        (left_f, left_golden_f, right_golden_f, right_f),
-        length,
-        accuracy
-    )
+        while True:
+            if f1 < f2:
+                b, fb = x2, f2
+                x2, f2 = x1, f1
+                left = True
+            else:
+                a, fa = x1, f1
+                x1, f1 = x2, f2
+                left = False
+
+            iter_n += 1
+            k -= 1
+            length = b - a
+
+            if k <= 2 or iter_n == max_iter:  # the golden points coincide at k == 2
+                break
+
+            if left:
+                x1 = a + fib[k-2] / fib[k] * length
+                f1 = func(x1)
+            else:
+                x2 = a + fib[k-1] / fib[k] * length
+                f2 = func(x2)
+            evaluations += 1
+
+    return _interval_result(a, b, fa, fb, iter_n, evaluations, output_receiver)
+
+
+def _interval_result(a, b, fa, fb, iter_n, evaluations, output_receiver):
+    x = (a + b) / 2
+    f = (fa + fb) / 2
+
+    if output_receiver:
+        output_receiver(iter_n=iter_n, x=x, f=f, evaluations=evaluations)
+
+    return x, f
 
 
 # =======================================================================================
-def dsk_powell(func: Callable, xs: tuple, fs: tuple, accuracy: float):
+def dsk_powell(func: Callable, xs: tuple, fs: tuple, accuracy: float, max_iter: int = -1):
     """
     :param func: Target unimodal function
     :param xs: (a, (a+b)/2, b) - interval that contains the min point
     :param fs: (f(a), f((a+b)/2), f(b))
     :param accuracy: Target interval length
+    :param max_iter: Iterations limit
     :return: x* and f(x*)
     """
 
-    approx_x, approx_f = _dsk_powell_approx(func, xs, fs)
+    iter_n = 0
 
-    # print('xs: %s\t\tfs: %s\t\tapprox_x: %f\t\tapprox_f: %f' % (vector_to_str(xs), vector_to_str(fs), approx_x, approx_f))
+    while True:
+        approx_x = _dsk_powell_approx(xs, fs)
 
-    if abs(xs[1] - approx_x) <= accuracy and abs(fs[1] - approx_f) <= accuracy:
-        return approx_x, approx_f
+        # Degenerate fit (coinciding points or a straight line) - the best known point is the answer
+        if approx_x is None:
+            i = np.argmin(fs)
+            return xs[i], fs[i]
 
-    # Choose a point with the lowest function value and two points around it
-    new_points = sorted(zip([*xs, approx_x], [*fs, approx_f]), key=lambda p: p[0])
-    min_i = min(2, max(1, np.argmin(tuple(map(lambda p: p[1], new_points)))))
-    new_xs = tuple(p[0] for p in new_points[min_i-1:min_i+2])
-    new_fs = tuple(p[1] for p in new_points[min_i-1:min_i+2])
+        approx_f = func(approx_x)
 
-    return dsk_powell(func, new_xs, new_fs, accuracy)
+        # print('xs: %s\t\tfs: %s\t\tapprox_x: %f\t\tapprox_f: %f' % (vector_to_str(xs), vector_to_str(fs), approx_x, approx_f))
 
+        if abs(xs[1] - approx_x) <= accuracy and abs(fs[1] - approx_f) <= accuracy or iter_n == max_iter:
+            return approx_x, approx_f
 
-def _dsk_powell_approx(func, xs, fs):
-    warnings.filterwarnings('error')
+        # Choose a point with the lowest function value and two points around it
+        new_points = sorted(zip([*xs, approx_x], [*fs, approx_f]), key=lambda p: p[0])
+        min_i = min(2, max(1, np.argmin(tuple(map(lambda p: p[1], new_points)))))
+        xs = tuple(p[0] for p in new_points[min_i-1:min_i+2])
+        fs = tuple(p[1] for p in new_points[min_i-1:min_i+2])
 
-    try:
-        a1 = (fs[1] - fs[0]) / (xs[1] - xs[0])
-        a2 = ((fs[2] - fs[0]) / (xs[2] - xs[0]) - a1) / (xs[2] - xs[1])
-        approx_x = (xs[0] + xs[1]) / 2 - a1 / 2 / a2
-        approx_f = func(approx_x)
-    except RuntimeWarning:  # if approx_x is NaN
-        i = np.argmin(fs)
-        approx_x = xs[i]
-        approx_f = fs[i]
+        iter_n += 1
+
+
+def _dsk_powell_approx(xs, fs):
+    if xs[1] == xs[0] or xs[2] == xs[0] or xs[2] == xs[1]:
+        return None
+
+    a1 = (fs[1] - fs[0]) / (xs[1] - xs[0])
+    a2 = ((fs[2] - fs[0]) / (xs[2] - xs[0]) - a1) / (xs[2] - xs[1])
 
-    warnings.resetwarnings()
+    if a2 == 0 or not np.isfinite(a2):
+        return None
 
-    return approx_x, approx_f
+    approx_x = (xs[0] + xs[1]) / 2 - a1 / 2 / a2
+
+    if not np.isfinite(approx_x):
+        return None
+
+    return approx_x
 
 
 # def vector_to_str(v):
-#     return '(%s)' % ', '.join(map(lambda x: '%f' % x, v))
\ No newline at end of file
+#     return '(%s)' % ', '.join(map(lambda x: '%f' % x, v))
+
+# =======================================================================================
+def brent(func: Callable, xs: tuple, fs: tuple, accuracy: float, max_iter: int = -1):
+    """
+    Brent's method: parabolic interpolation through the three best points,
+    with golden section steps whenever the parabola is not trusted.
+
+    :param func: Target unimodal function
+    :param xs: (a, x, b) - interval that contains the min point and the best point inside it (as returned by sven)
+    :param fs: (f(a), f(x), f(b))
+    :param accuracy: Target interval length
+    :param max_iter: Iterations limit
+    :return: x* and f(x*)
+    """
+
+    a, b = xs[0], xs[-1]
+
+    if len(xs) == 3:
+        x, fx = xs[1], fs[1]
+    else:
+        x = a + GOLDEN_SECTION_A * (b - a)
+        fx = func(x)
+
+    w, fw = x, fx  # second best point
+    v, fv = x, fx  # previous value of w
+    d = e = 0  # the last step and the step before it
+
+    tol = accuracy / 4
+    iter_n = 0
+
+    while True:
+        xm = (a + b) / 2
+
+        if abs(x - xm) <= 2 * tol - (b - a) / 2 or iter_n == max_iter:
+            return x, fx
+
+        parabolic = False
+
+        if abs(e) > tol:
+            # Parabola through x, w, v
+            r = (x - w) * (fx - fv)
+            q = (x - v) * (fx - fw)
+            p = (x - v) * q - (x - w) * r
+            q = 2 * (q - r)
+            if q > 0:
+                p = -p
+            q = abs(q)
+
+            # Accept the step if it is inside the interval and shorter than half of the step before the last one
+            if abs(p) < abs(q * e / 2) and q * (a - x) < p < q * (b - x):
+                e = d
+                d = p / q
+                u = x + d
+                if u - a < 2 * tol or b - u < 2 * tol:
+                    d = tol if xm >= x else -tol
+                parabolic = True
+
+        if not parabolic:
+            e = (a if x >= xm else b) - x
+            d = GOLDEN_SECTION_A * e
+
+        # Never evaluate closer than tol to x
+        u = x + d if abs(d) >= tol else x + (tol if d > 0 else -tol)
+        fu = func(u)
+
+        if fu <= fx:
+            if u >= x:
+                a = x
+            else:
+                b = x
+            v, fv = w, fw
+            w, fw = x, fx
+            x, fx = u, fu
+        else:
+            if u < x:
+                a = u
+            else:
+                b = u
+            if fu <= fw or w == x:
+                v, fv = w, fw
+                w, fw = u, fu
+            elif fu <= fv or v == x or v == w:
+                v, fv = u, fu
+
+        iter_n += 1
+
+
+# =======================================================================================
+def wolfe(
+        func: Callable, f0: float, d0: float, step: float, accuracy: float,
+        derivative: Callable = None, c1: float = 1e-4, c2: float = 0.1, max_iter: int = -1
+):
+    """
+    Inexact line search: accepts the first step that satisfies the strong Wolfe conditions.
+    Does not need a bracket from sven.
+
+    :param func: Target function of the step length
+    :param f0: func(0)
+    :param d0: func'(0), must be negative
+    :param step: Starting step
+    :param accuracy: Minimal length of the interval that contains an acceptable step, relative to the step
+    :param derivative: func'(x), if None - only the sufficient decrease (Armijo) condition is checked
+    :param c1: Sufficient decrease parameter
+    :param c2: Curvature parameter (c2 < 0.5 keeps conjugate gradient directions descent ones)
+    :param max_iter: Iterations limit
+    :return: x* and f(x*)
+    """
+
+    if derivative is None:
+        return armijo(func, f0, d0, step, accuracy, c1=c1, max_iter=max_iter)
+
+    x_prev, f_prev, d_prev = 0, f0, d0
+    x = step
+
+    iter_n = 0
+
+    while True:
+        f = func(x)
+
+        if f > f0 + c1 * x * d0 or (iter_n > 0 and f >= f_prev):
+            return _wolfe_zoom(func, derivative, f0, d0, x_prev, f_prev, d_prev, x, f, accuracy, c1, c2, max_iter)
+
+        d = derivative(x)
+
+        if abs(d) <= -c2 * d0:
+            return x, f
+
+        if d >= 0:
+            return _wolfe_zoom(func, derivative, f0, d0, x, f, d, x_prev, f_prev, accuracy, c1, c2, max_iter)
+
+        if iter_n == max_iter:
+            return x, f
+
+        x_prev, f_prev, d_prev = x, f, d
+        x *= 2
+
+        iter_n += 1
+
+
+def _wolfe_zoom(func, derivative, f0, d0, x_lo, f_lo, d_lo, x_hi, f_hi, accuracy, c1, c2, max_iter):
+    iter_n = 0
+
+    while abs(x_hi - x_lo) > accuracy * max(abs(x_lo), abs(x_hi)) and iter_n != max_iter:
+        # Minimum of the quadratic through (x_lo, f_lo, d_lo) and (x_hi, f_hi), kept away from the ends
+        length = x_hi - x_lo
+        denominator = f_hi - f_lo - d_lo * length
+        if denominator > 0:
+            x = x_lo - d_lo * length ** 2 / 2 / denominator
+        else:
+            x = x_lo + length / 2
+        x = min(max(x, x_lo + 0.1 * length), x_lo + 0.9 * length) if length > 0 \
+            else max(min(x, x_lo + 0.1 * length), x_lo + 0.9 * length)
+
+        f = func(x)
+
+        if f > f0 + c1 * x * d0 or f >= f_lo:
+            x_hi, f_hi = x, f
+        else:
+            d = derivative(x)
+
+            if abs(d) <= -c2 * d0:
+                return x, f
+
+            if d * (x_hi - x_lo) >= 0:
+                x_hi, f_hi = x_lo, f_lo
+
+            x_lo, f_lo, d_lo = x, f, d
+
+        iter_n += 1
+
+    return x_lo, f_lo
+
+
+def armijo(
+        func: Callable, f0: float, d0: float, step: float, accuracy: float,
+        derivative: Callable = None, c1: float = 1e-4, max_iter: int = -1
+):
+    """
+    Backtracking line search: halves the step until the sufficient decrease condition holds.
+    If the starting step already satisfies it, the step is doubled while it still does and f decreases,
+    so a too short starting step does not stall the search. Does not need a bracket from sven.
+    Search methods start it from the previous accepted step (the "warm_start" attribute).
+
+    :param func: Target function of the step length
+    :param f0: func(0)
+    :param d0: func'(0), must be negative
+    :param step: Starting step
+    :param accuracy: Minimal step
+    :param derivative: Not used, accepted for interchangeability with wolfe
+    :param c1: Sufficient decrease parameter
+    :param max_iter: Iterations limit
+    :return: x* and f(x*)
+    """
+
+    x = step
+    f = func(x)
+
+    iter_n = 0
+
+    if f <= f0 + c1 * x * d0:
+        while iter_n != max_iter:
+            f_next = func(2 * x)
+            if f_next > f0 + c1 * 2 * x * d0 or f_next >= f:
+                break
+            x, f = 2 * x, f_next
+            iter_n += 1
+        return x, f
+
+    while f > f0 + c1 * x * d0:
+        if x / 2 < accuracy or iter_n == max_iter:
+            return (x, f) if f < f0 else (0, f0)
+
+        x /= 2
+        f = func(x)
+
+        iter_n += 1
+
+    return x, f
+
+
+# Line searches that don't use a bracket, called as
+# lambda_method(func, f0, d0, step, accuracy, derivative=...)
+wolfe.inexact = True
+armijo.inexact = True
+armijo.warm_start = True  # only the previous accepted step is a sensible scale to start from
+
+
+# =======================================================================================
+def sven_lockstep(func: Callable, x0: np.ndarray, delta0, expansion: float = 2):
+    """
+    Sven method for k independent lines at once. Every step evaluates all the unfinished lines with one call.
+
+    :param func: func(xs, lines) - values of the target functions of the given lines at the given points
+    :param x0: Starting points, one per line
+    :param delta0: Starting step (scalar or one per line)
+    :param expansion: Step multiplier
+    :return:
+        (a, m, b) - arrays of the intervals that contain the min points
+        (f(a), f(m), f(b)) - function values
+    """
+
+    k = len(x0)
+    lines = np.arange(k)
+    delta = np.array(np.broadcast_to(delta0, (k,)), dtype=np.float64)
+
+    fs = func(np.concatenate((x0, x0 - delta, x0 + delta)), np.concatenate((lines, lines, lines)))
+    f0, f_left, f_right = fs[:k], fs[k:2*k], fs[2*k:]
+
+    # Choose direction
+    bracketed = (f_left >= f0) & (f0 <= f_right)
+    right = f_left >= f_right
+    delta[~right] *= -1
+
+    xs = [x0 - np.abs(delta), x0.astype(np.float64), x0 + np.abs(delta)]
+    fs = [f_left, f0, f_right]
+
+    prev2_x, prev2_f = x0.astype(np.float64), f0.copy()
+    prev_x = x0 + delta
+    prev_f = np.where(right, f_right, f_left)
+    last_x, last_f = prev_x.copy(), prev_f.copy()
+
+    # Move forward
+    moving = np.flatnonzero(~bracketed)
+    while moving.size:
+        delta[moving] *= expansion
+
+        new_x = prev_x[moving] + delta[moving]
+        new_f = func(new_x, moving)
+
+        last_x[moving], last_f[moving] = new_x, new_f
+
+        go_on = new_f < prev_f[moving]
+        cont = moving[go_on]
+        prev2_x[cont], prev2_f[cont] = prev_x[cont], prev_f[cont]
+        prev_x[cont], prev_f[cont] = last_x[cont], last_f[cont]
+
+        moving = cont
+
+    # Move back and choose the interval
+    back = np.flatnonzero(~bracketed)
+    if back.size:
+        half_x = last_x[back] - delta[back] / 2
+        half_f = func(half_x, back)
+
+        closer = half_f < prev_f[back]
+        a = np.where(closer, prev_x[back], prev2_x[back])
+        fa = np.where(closer, prev_f[back], prev2_f[back])
+        m = np.where(closer, half_x, prev_x[back])
+        fm = np.where(closer, half_f, prev_f[back])
+        b = np.where(closer, last_x[back], half_x)
+        fb = np.where(closer, last_f[back], half_f)
+
+        backward = delta[back] < 0
+        xs[0][back], fs[0][back] = np.where(backward, b, a), np.where(backward, fb, fa)
+        xs[1][back], fs[1][back] = m, fm
+        xs[2][back], fs[2][back] = np.where(backward, a, b), np.where(backward, fa, fb)
+
+    return tuple(xs), tuple(fs)
+
+
+def golden_section_lockstep(func: Callable, xs: tuple, fs: tuple, accuracy: float, max_iter: int = -1):
+    """
+    Golden section for k independent lines at once. Every step evaluates all the unfinished lines with one call.
+
+    :param func: func(xs, lines) - values of the target functions of the given lines at the given points
+    :param xs: (a, ..., b) - arrays of the intervals that contain the min points
+    :param fs: (f(a), ..., f(b)) - function values
+    :param accuracy: Target interval length
+    :param max_iter: Iterations limit
+    :return: Arrays of x* and f(x*)
+    """
+
+    k = len(xs[0])
+    lines = np.arange(k)
+
+    a, b = np.array(xs[0], dtype=np.float64), np.array(xs[-1], dtype=np.float64)
+    fa, fb = np.array(fs[0], dtype=np.float64), np.array(fs[-1], dtype=np.float64)
+
+    x1 = a + GOLDEN_SECTION_A * (b - a)
+    x2 = a + (1 - GOLDEN_SECTION_A) * (b - a)
+    f12 = func(np.concatenate((x1, x2)), np.concatenate((lines, lines)))
+    f1, f2 = f12[:k], f12[k:]
+
+    active = np.flatnonzero(b - a > accuracy)
+
+    iter_n = 0
+
+    while active.size and iter_n != max_iter:
+        left = active[f1[active] < f2[active]]
+        right = active[f1[active] >= f2[active]]
+
+        b[left], fb[left] = x2[left], f2[left]
+        x2[left], f2[left] = x1[left], f1[left]
+        x1[left] = a[left] + GOLDEN_SECTION_A * (b[left] - a[left])
+
+        a[right], fa[right] = x1[right], f1[right]
+        x1[right], f1[right] = x2[right], f2[right]
+        x2[right] = a[right] + (1 - GOLDEN_SECTION_A) * (b[right] - a[right])
+
+        new_f = func(np.concatenate((x1[left], x2[right])), np.concatenate((left, right)))
+        f1[left], f2[right] = new_f[:len(left)], new_f[len(left):]
+
+        active = active[b[active] - a[active] > accuracy]
+        iter_n += 1
+
+    return (a + b) / 2, (fa + fb) / 2
+
+
+# =======================================================================================
+def sven_vectorized(func: Callable, x0: float, delta0: float, expansion: float = 2, count: int = 8):
+    """
+    Sven method for a vectorized function: the starting triple is evaluated with one call, then the doubling
+    sequence, together with the half-steps back, is evaluated by count steps with one call per batch.
+
+    :param func: Target unimodal function (must accept arrays of points)
+    :param x0: Starting point
+    :param delta0: Starting step
+    :param expansion: Step multiplier
+    :param count: Number of steps evaluated with one call
+    :return:
+        (a, (a+b)/2, b) - interval that contains the min point
+        (f(a), f((a+b)/2), f(b)) - function values
+    """
+
+    x_left = x0 - delta0
+    x_right = x0 + delta0
+    f0, f_left, f_right = func(np.array((x0, x_left, x_right), dtype=np.float64))
+
+    # Choose direction
+    if f_left >= f0 <= f_right:
+        return (x_left, x0, x_right), (f_left, f0, f_right)
+    elif f_left >= f_right:
+        xs, fs = [x0, x_right], [f0, f_right]
+        delta = delta0
+    else:
+        xs, fs = [x0, x_left], [f0, f_left]
+        delta = -delta0
+
+    # Move forward
+    while True:
+        deltas = delta * np.cumprod(np.full(count, expansion, dtype=np.float64))
+        new_xs = np.cumsum(np.concatenate(((xs[-1],), deltas)))[1:]
+        half_xs = new_xs - deltas / 2
+
+        values = func(np.concatenate((new_xs, half_xs)))
+        new_fs, half_fs = values[:count], values[count:]
+
+        stop = np.flatnonzero(new_fs >= np.concatenate(((fs[-1],), new_fs[:-1])))
+        k = stop[0] if stop.size else count - 1
+
+        xs.extend(new_xs[:k+1])
+        fs.extend(new_fs[:k+1])
+        delta = deltas[k]
+
+        if stop.size:
+            break
+
+    # Choose the interval
+    if half_fs[k] < fs[-2]:
+        result_xs = [xs[-2], half_xs[k], xs[-1]]
+        result_fs = [fs[-2], half_fs[k], fs[-1]]
+    else:
+        result_xs = [xs[-3], xs[-2], half_xs[k]]
+        result_fs = [fs[-3], fs[-2], half_fs[k]]
+
+    if delta < 0:
+        result_xs.reverse()
+        result_fs.reverse()
+
+    return tuple(result_xs), tuple(result_fs)
+
+
+def grid_refinement(func: Callable, xs: tuple, fs: tuple, accuracy: float, max_iter: int = -1, points: int = 8):
+    """
+    Evaluates a uniform grid inside the interval with one call and shrinks the interval to the neighbours
+    of the best point, (points + 1) / 2 times per call.
+
+    :param func: Target unimodal function (must accept arrays of points)
+    :param xs: (a, ..., b) - interval that contains the min point
+    :param fs: (f(a), ..., f(b)) - function values
+    :param accuracy: Target interval length
+    :param max_iter: Iterations limit
+    :param points: Number of points evaluated with one call
+    :return: x* and f(x*)
+    """
+
+    a, b = xs[0], xs[-1]
+    i = np.argmin(fs)
+    x_best, f_best = xs[i], fs[i]
+
+    iter_n = 0
+
+    while b - a > accuracy and iter_n != max_iter:
+        grid = np.linspace(a, b, points + 2)
+        step = grid[1] - grid[0]
+
+        grid_fs = func(grid[1:-1])
+        k = np.argmin(grid_fs)
+        if grid_fs[k] < f_best:
+            x_best, f_best = grid[k + 1], grid_fs[k]
+
+        # The neighbours of the best point (grid points or the known ones between them) are no farther
+        # than a grid step, so the min point stays in the interval even if some points almost coincide
+        a, b = max(a, x_best - step), min(b, x_best + step)
+
+        iter_n += 1
+
+    return x_best, f_best
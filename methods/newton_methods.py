@@ -0,0 +1,164 @@
+from concurrent.futures import Executor
+from typing import Callable
+
+import numpy as np
+
+from methods.derivation_methods import DerivationMethod, nabla, nabla_hessian
+from methods.evaluation import CachedFunction, EvaluationContext
+from methods.gradient_methods import TerminationCriterion, Modification, \
+    get_func_of_lambda, get_lambda_bounds, get_finite_direction, \
+    get_derivative_of_lambda, get_counted_func, check_termination
+from methods.interval_methods import sven
+from methods.termination import TerminationPolicy
+
+
+# =======================================================================================
+def newton(
+        func: Callable,
+        x0: np.ndarray,
+        derivation_method: DerivationMethod, derivation_h: float,
+        lambda_method: Callable, delta_lambda: float, lambda_accuracy: float,
+        modification: Modification, termination_criterion: TerminationCriterion, accuracy: float,
+        modified: bool = False,
+        restart_lambda_threshold: float = -1,
+        max_iter: int = -1,
+        derivation_batched: bool = False,
+        derivation_executor: Executor = None,
+        cache_size: int = 0,
+        termination_policy: TerminationPolicy = None,
+        context: EvaluationContext = None,
+        output_receiver: Callable = None
+):
+    """
+    Newton method with a line search along the Newton direction. The gradient and the Hessian are calculated
+    by symmetric differences from a single stencil per iteration (a single vectorized call if derivation_batched).
+    Has the same signature as fletcher_reeves, so it can be used as a search_method; derivation_method must be
+    SYM_DIFF, modification is accepted for interchangeability and ignored. Inexact line searches start from
+    the full Newton step.
+
+    :param modified: If the Hessian is not positive definite - shift its spectrum (modified Newton method)
+        instead of making a gradient step
+    """
+
+    if x0.dtype != np.float64:
+        raise Warning('Method might not work as expected if the x0 vector consists of non-floats')
+
+    if derivation_method != DerivationMethod.SYM_DIFF:
+        raise ValueError('Unsupported derivation method')
+
+    max_step = getattr(func, 'max_step', None)  # feasible step length, e.g. of an interior barrier
+
+    if context is not None:
+        func = context.target(func)
+
+    func, counted = get_counted_func(func, termination_policy)
+
+    if cache_size > 0:
+        func = CachedFunction(func, cache_size, context)
+
+    # Line search trial points need only the gradient, the Hessian stencil is evaluated at the accepted points
+    def grad(x, f):
+        return nabla(
+            func, x, derivation_h, derivation_method, batched=derivation_batched, executor=derivation_executor
+        )
+
+    x0 = np.array(x0, dtype=np.float64)
+    x_lamb = np.empty_like(x0)
+
+    f0 = func(*x0)
+    nabla0, hessian0 = nabla_hessian(
+        func, x0, derivation_h, f0=f0, batched=derivation_batched, executor=derivation_executor
+    )
+
+    iter_n = 0
+
+    while True:
+        s0 = get_finite_direction(_newton_direction(nabla0, hessian0, modified), nabla0)
+        if s0 is None:  # the search cannot continue
+            if output_receiver:
+                output_receiver(iter_n=iter_n, x=x0, f=f0)
+            return x0, f0
+
+        for i in range(2):
+            func_lamb = get_func_of_lambda(func, x0, s0, out=x_lamb)
+
+            if getattr(lambda_method, 'inexact', False):
+                derivative = get_derivative_of_lambda(grad, x0, s0)
+                lambda_opt, f1 = lambda_method(
+                    func_lamb, f0, np.inner(nabla0, s0), 1.0, lambda_accuracy, derivative=derivative
+                )
+                lambda_opt_x_interval = (0, lambda_opt)
+            else:
+                lambda_opt_x_interval, lambda_opt_f_interval = sven(
+                    func_lamb, 0, delta_lambda, bounds=get_lambda_bounds(max_step, x0, s0)
+                )
+                lambda_opt, f1 = lambda_method(func_lamb, lambda_opt_x_interval, lambda_opt_f_interval, lambda_accuracy)
+
+            if restart_lambda_threshold < 0 or lambda_opt > restart_lambda_threshold:
+                break
+
+            s0 = -nabla0  # "restart"
+
+        if output_receiver:
+            output_receiver(
+                iter_n=iter_n,
+                x=x0.copy(),
+                f=f0,
+                nabla=nabla0,
+                s=s0,
+                lambda_interval=lambda_opt_x_interval,
+                lambda_opt=lambda_opt
+            )
+
+        x1 = x0 + lambda_opt * s0
+        nabla1, hessian1 = nabla_hessian(
+            func, x1, derivation_h, f0=f1, batched=derivation_batched, executor=derivation_executor
+        )
+
+        terminate = check_termination(termination_criterion, accuracy, x0, x1, f0, f1, s0, nabla1)
+
+        if termination_policy is not None and not terminate:
+            terminate = termination_policy(
+                iter_n=iter_n, x_prev=x0, x=x1, f_prev=f0, f=f1, nabla=nabla1, s=s0, evaluations=counted.evaluations
+            )
+
+        if iter_n == max_iter:
+            terminate = True
+
+        if terminate:
+            if output_receiver:
+                if cache_size > 0:
+                    output_receiver(iter_n=iter_n+1, x=x1, f=f1, cache_hits=func.hits, cache_misses=func.misses)
+                else:
+                    output_receiver(iter_n=iter_n+1, x=x1, f=f1)
+            return x1, f1
+
+        x0 = x1
+        f0 = f1
+        nabla0 = nabla1
+        hessian0 = hessian1
+
+        iter_n += 1
+
+
+def _newton_direction(nabla, hessian, modified):
+    if not np.all(np.isfinite(hessian)):  # e.g. the stencil has left the feasible region of a barrier
+        return -nabla
+
+    try:
+        np.linalg.cholesky(hessian)
+        return np.linalg.solve(hessian, -nabla)
+    except np.linalg.LinAlgError:
+        if not modified:
+            return -nabla
+
+    # Shift the spectrum until the Hessian becomes positive definite
+    identity = np.eye(len(nabla))
+    tau = max(1e-3 * np.max(np.abs(np.diag(hessian))), 1e-8)
+
+    while True:
+        try:
+            np.linalg.cholesky(hessian + tau * identity)
+            return np.linalg.solve(hessian + tau * identity, -nabla)
+        except np.linalg.LinAlgError:
+            tau *= 10
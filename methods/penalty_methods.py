@@ -1,21 +1,39 @@
 from copy import deepcopy
+from enum import Enum
+from inspect import signature
+from numbers import Real
 from typing import Callable
 
 import numpy as np
 
+from methods.evaluation import CachedFunction, ContextCountedFunction, EvaluationContext
+from methods.gradient_methods import get_gradient_func
+from methods.termination import TerminationPolicy, nested, budgets
+
 
 # === BARRIER GENERATORS ===
+# Every barrier is a quadratic c(x1, x2) = k1 x1^2 + k2 x1 x2 + k3 x2^2 + k4 x1 + k5 x2 + k6,
+# the constraint is c <= 0. The coefficients (k1, ..., k6) are kept in the "coefficients" attribute
+# and the analytic gradient of c in the "gradient" attribute. Keep-out regions (inverted circles and ellipses)
+# can be violated only inside their bounding box (x1_min, x2_min, x1_max, x2_max), kept in the "bounds" attribute.
 def barrier_circle(x: float, y: float, r: float, invert: bool):
-    return lambda x1, x2: _inv((x1 - x) ** 2 + (x2 - y) ** 2 - r ** 2, invert)
+    barrier = lambda x1, x2: _inv((x1 - x) ** 2 + (x2 - y) ** 2 - r ** 2, invert)
+    return _quadratic(
+        barrier, (1, 0, 1, -2 * x, -2 * y, x ** 2 + y ** 2 - r ** 2), invert, (x - r, y - r, x + r, y + r)
+    )
 
 
 def barrier_line(x: float, y: float, angle: float, invert: bool):
     if angle == -90:
-        return lambda x1, x2: _inv((x1 - x), invert)
+        barrier = lambda x1, x2: _inv((x1 - x), invert)
+        return _quadratic(barrier, (0, 0, 0, 1, 0, -x), invert)
     elif angle == 90:
-        return lambda x1, x2: _inv(-(x1 - x), invert)
+        barrier = lambda x1, x2: _inv(-(x1 - x), invert)
+        return _quadratic(barrier, (0, 0, 0, -1, 0, x), invert)
 
-    return lambda x1, x2: _inv(np.tan(np.deg2rad(angle)) * (x1 - x) + y - x1, invert)
+    tan = np.tan(np.deg2rad(angle))
+    barrier = lambda x1, x2: _inv(tan * (x1 - x) + y - x2, invert)
+    return _quadratic(barrier, (0, 0, 0, tan, -1, y - tan * x), invert)
 
 
 def barrier_ellipse(x: float, y: float, a: float, b: float, angle: float, invert: bool):
@@ -30,7 +48,12 @@ def barrier_ellipse(x: float, y: float, a: float, b: float, angle: float, invert
     k5 = -k2 * x - 2 * k3 * y
     k6 = k1 * x ** 2 + k2 * x * y + k3 * y ** 2 - a ** 2 * b ** 2
 
-    return lambda x1, x2: _inv(k1 * x1 ** 2 + k2 * x1 * x2 + k3 * x2 ** 2 + k4 * x1 + k5 * x2 + k6, invert)
+    # Half-sizes of the bounding box of the rotated ellipse
+    w = np.sqrt((a * cos_theta) ** 2 + (b * sin_theta) ** 2)
+    h = np.sqrt((a * sin_theta) ** 2 + (b * cos_theta) ** 2)
+
+    barrier = lambda x1, x2: _inv(k1 * x1 ** 2 + k2 * x1 * x2 + k3 * x2 ** 2 + k4 * x1 + k5 * x2 + k6, invert)
+    return _quadratic(barrier, (k1, k2, k3, k4, k5, k6), invert, (x - w, y - h, x + w, y + h))
 
 
 def _inv(v: float, invert: bool):
@@ -39,11 +62,301 @@ def _inv(v: float, invert: bool):
     return v
 
 
+def _quadratic(barrier: Callable, coefficients: tuple, invert: bool, bounds: tuple = None):
+    k = _inv(np.array(coefficients, dtype=np.float64), invert)
+    barrier.coefficients = k
+    barrier.gradient = lambda x1, x2: np.array((
+        2 * k[0] * x1 + k[1] * x2 + k[3],
+        k[1] * x1 + 2 * k[2] * x2 + k[4]
+    ))
+    if invert and bounds is not None:
+        barrier.bounds = tuple(float(b) for b in bounds)
+    return barrier
+
+
+# === CONSTRAINT SET ===
+class ConstraintSet:
+    """
+    Barriers packed into an m x 6 matrix of their coefficients. All the constraints are evaluated
+    with one matrix product, for a single point or for arrays of points.
+    """
+
+    def __init__(self, constraints: list[Callable]):
+        self.coefficients = np.array([c.coefficients for c in constraints], dtype=np.float64).reshape(-1, 6)
+
+    @staticmethod
+    def supports(constraints) -> bool:
+        return len(constraints) > 0 and all(hasattr(c, 'coefficients') for c in constraints)
+
+    def __len__(self):
+        return len(self.coefficients)
+
+    def __call__(self, x1, x2) -> np.ndarray:
+        """
+        :return: Values of all the constraints, m x (shape of x1 and x2)
+        """
+
+        return _quadratic_values(self.coefficients, x1, x2)
+
+    def violations(self, x1, x2, shifts: np.ndarray = None) -> np.ndarray:
+        """
+        :param shifts: Added to the constraint values, one per constraint (e.g. scaled Lagrange multipliers)
+        """
+
+        values = self(x1, x2)
+        if shifts is not None:
+            values = values + np.reshape(shifts, (-1,) + (1,) * np.ndim(x1))
+        return np.maximum(values, 0)
+
+    def penalty(self, x1, x2):
+        """
+        :return: Sum of the squared violations (a scalar or an array of the shape of x1 and x2)
+        """
+
+        return np.sum(self.violations(x1, x2) ** 2, axis=0)
+
+    def gradients(self, x1, x2) -> np.ndarray:
+        """
+        :return: Gradients of all the constraints, 2 x m x (shape of x1 and x2)
+        """
+
+        return _quadratic_gradients(self.coefficients, x1, x2)
+
+    def max_step(self, x: np.ndarray, s: np.ndarray) -> float:
+        """
+        :return: The largest lambda, such that all the constraints are satisfied on (x, x + lambda * s)
+            (inf if the ray never leaves the region), x must satisfy them
+        """
+
+        k = self.coefficients
+
+        # Along the scaled direction, so that the coefficients don't overflow for a long s
+        scale = np.max(np.abs(s))
+        if scale == 0:
+            return np.inf
+        s = s / scale
+
+        # c(x + lambda * s) = a * lambda^2 + b * lambda + c
+        a = k[:, 0] * s[0] ** 2 + k[:, 1] * s[0] * s[1] + k[:, 2] * s[1] ** 2
+        b = self.gradients(*x).T @ s
+        c = self(*x)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sqrt_d = np.sqrt(b ** 2 - 4 * a * c)
+            # Roots in the cancellation-free form; 2c / (-b - sqrt_d) is also the root of the linear case
+            roots = np.stack((2 * c / (-b - sqrt_d), (-b - sqrt_d) / 2 / a))
+
+        roots[~(roots > 0)] = np.inf
+        return float(np.min(roots, initial=np.inf)) / scale
+
+    def penalty_gradient(self, x1, x2, shifts: np.ndarray = None) -> np.ndarray:
+        """
+        :return: Gradient of the penalty, 2 x (shape of x1 and x2)
+        """
+
+        return np.sum(2 * self.violations(x1, x2, shifts) * self.gradients(x1, x2), axis=1)
+
+
+def _monomials(x1, x2):
+    if isinstance(x1, Real):
+        return np.array((x1 * x1, x1 * x2, x2 * x2, x1, x2, 1))
+    return np.stack((x1 * x1, x1 * x2, x2 * x2, x1, x2, np.ones_like(x1)))
+
+
+def _quadratic_values(k, x1, x2):
+    return np.tensordot(k, _monomials(*np.broadcast_arrays(x1, x2)), axes=1)
+
+
+def _quadratic_gradients(k, x1, x2):
+    k = k.reshape((len(k), 6) + (1,) * np.ndim(x1))
+    return np.stack((
+        2 * k[:, 0] * x1 + k[:, 1] * x2 + k[:, 3],
+        k[:, 1] * x1 + 2 * k[:, 2] * x2 + k[:, 4]
+    ))
+
+
+def _ranges(starts, counts):
+    """
+    :return: Concatenated ranges [start, start + count)
+    """
+
+    return np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(np.sum(counts))
+
+
+class ConstraintGrid(ConstraintSet):
+    """
+    ConstraintSet for many keep-out regions. The barriers with a bounding box ("bounds" attribute) are
+    registered in the cells of a uniform grid that their boxes overlap, so the penalty at a point checks only
+    the barriers of its cell (and the barriers without bounds, which are checked everywhere).
+    The constraint values (__call__) and the shifted violations are still evaluated for all the constraints.
+    """
+
+    MIN_BOUNDED = 32  # fewer keep-out regions are evaluated faster by a single matrix product
+
+    def __init__(self, constraints: list[Callable], cell_size: float = None):
+        """
+        :param cell_size: Side of a grid cell (by default the median size of the bounding boxes)
+        """
+
+        super().__init__(constraints)
+
+        bounded = np.array([hasattr(c, 'bounds') for c in constraints], dtype=bool)
+        self._unbounded = self.coefficients[~bounded]
+        self._bounded = self.coefficients[bounded]
+
+        boxes = np.array([c.bounds for c in constraints if hasattr(c, 'bounds')], dtype=np.float64).reshape(-1, 4)
+        if cell_size is None:
+            sizes = np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1])
+            cell_size = np.median(sizes) if len(sizes) else 1
+        self.cell_size = max(float(cell_size), np.finfo(np.float64).tiny)
+
+        self._origin = tuple(boxes[:, :2].min(axis=0)) if len(boxes) else (0.0, 0.0)
+        lo = np.floor((boxes[:, :2] - self._origin) / self.cell_size).astype(np.int64)
+        hi = np.floor((boxes[:, 2:] - self._origin) / self.cell_size).astype(np.int64)
+        self._shape = tuple(int(n) for n in hi.max(axis=0) + 1) if len(boxes) else (0, 0)
+
+        # Only the occupied cells are stored: the barriers of the cell self._cells[n]
+        # are self._barriers[self._offsets[n]:self._offsets[n + 1]]
+        widths, heights = (hi - lo + 1).T
+        barriers = np.repeat(np.arange(len(boxes)), widths * heights)
+        within = _ranges(np.zeros_like(widths), widths * heights)  # index of the cell within the box
+        c1 = lo[barriers, 0] + within // heights[barriers]
+        c2 = lo[barriers, 1] + within % heights[barriers]
+        cells = c1 * self._shape[1] + c2
+
+        order = np.argsort(cells, kind='stable')
+        self._barriers = barriers[order]
+        self._cells, counts = np.unique(cells[order], return_counts=True)
+        self._offsets = np.concatenate(((0,), np.cumsum(counts)))
+
+        # Single points: coefficients of everything to check in a cell, looked up by the cell
+        self._local = {
+            int(cell): np.concatenate((self._unbounded, self._bounded[self._barriers[a:b]]))
+            for cell, a, b in zip(self._cells, self._offsets[:-1], self._offsets[1:])
+        }
+
+    @staticmethod
+    def supports(constraints) -> bool:
+        return ConstraintSet.supports(constraints) \
+            and sum(hasattr(c, 'bounds') for c in constraints) >= ConstraintGrid.MIN_BOUNDED
+
+    def candidates(self, x1: float, x2: float) -> np.ndarray:
+        """
+        :return: Indices (among the barriers with bounds) of the keep-out regions that can be violated at the point
+        """
+
+        n = self._cell_index(np.array([x1], dtype=np.float64), np.array([x2], dtype=np.float64))[0]
+        if n < 0:
+            return self._barriers[:0]
+        return self._barriers[self._offsets[n]:self._offsets[n + 1]]
+
+    def penalty(self, x1, x2):
+        if isinstance(x1, Real) and isinstance(x2, Real):
+            violations = np.maximum(self._local_coefficients(x1, x2) @ _monomials(x1, x2), 0)
+            return violations @ violations
+
+        shape, x1, x2, points, k = self._pairs(x1, x2)
+
+        violations = np.maximum(np.einsum('ij,ji->i', k, _monomials(x1[points], x2[points])), 0)
+        local = np.bincount(points, violations ** 2, x1.size)
+
+        unbounded = np.sum(np.maximum(_quadratic_values(self._unbounded, x1, x2), 0) ** 2, axis=0)
+        return (unbounded + local).reshape(shape)
+
+    def penalty_gradient(self, x1, x2, shifts: np.ndarray = None) -> np.ndarray:
+        if shifts is not None:
+            return super().penalty_gradient(x1, x2, shifts)
+
+        if isinstance(x1, Real) and isinstance(x2, Real):
+            k = self._local_coefficients(x1, x2)
+            violations = np.maximum(k @ _monomials(x1, x2), 0)
+            return 2 * np.array((
+                violations @ (2 * k[:, 0] * x1 + k[:, 1] * x2 + k[:, 3]),
+                violations @ (k[:, 1] * x1 + 2 * k[:, 2] * x2 + k[:, 4])
+            ))
+
+        shape, x1, x2, points, k = self._pairs(x1, x2)
+        y1, y2 = x1[points], x2[points]
+
+        violations = np.maximum(np.einsum('ij,ji->i', k, _monomials(y1, y2)), 0)
+        local = np.stack((
+            np.bincount(points, 2 * violations * (2 * k[:, 0] * y1 + k[:, 1] * y2 + k[:, 3]), x1.size),
+            np.bincount(points, 2 * violations * (k[:, 1] * y1 + 2 * k[:, 2] * y2 + k[:, 4]), x1.size)
+        ))
+
+        violations = np.maximum(_quadratic_values(self._unbounded, x1, x2), 0)
+        unbounded = np.sum(2 * violations * _quadratic_gradients(self._unbounded, x1, x2), axis=1)
+        return (unbounded + local).reshape((2,) + shape)
+
+    def _local_coefficients(self, x1: float, x2: float) -> np.ndarray:
+        """
+        :return: Coefficients of the barriers that can be violated at the point
+        """
+
+        i = (x1 - self._origin[0]) // self.cell_size
+        j = (x2 - self._origin[1]) // self.cell_size
+        if 0 <= i < self._shape[0] and 0 <= j < self._shape[1]:
+            return self._local.get(int(i) * self._shape[1] + int(j), self._unbounded)
+        return self._unbounded
+
+    def _pairs(self, x1, x2):
+        """
+        :return: The shape of the points, the flattened points and every pair of a point (its index)
+            and a barrier of its cell (its coefficients)
+        """
+
+        x1, x2 = np.broadcast_arrays(np.asarray(x1, dtype=np.float64), np.asarray(x2, dtype=np.float64))
+        shape = x1.shape
+        x1, x2 = x1.ravel(), x2.ravel()
+
+        cells = self._cell_index(x1, x2)
+        occupied = np.flatnonzero(cells >= 0)
+        starts, counts = self._offsets[cells[occupied]], np.diff(self._offsets)[cells[occupied]]
+
+        points = np.repeat(occupied, counts)
+        k = self._bounded[self._barriers[_ranges(starts, counts)]]
+
+        return shape, x1, x2, points, k
+
+    def _cell_index(self, x1: np.ndarray, x2: np.ndarray) -> np.ndarray:
+        """
+        :return: Positions of the cells of the points in self._cells (-1 for the empty cells)
+        """
+
+        if not len(self._cells):
+            return np.full(np.shape(x1), -1)
+
+        i = np.floor((x1 - self._origin[0]) / self.cell_size)
+        j = np.floor((x2 - self._origin[1]) / self.cell_size)
+        inside = (i >= 0) & (i < self._shape[0]) & (j >= 0) & (j < self._shape[1])
+
+        cells = np.where(inside, i * self._shape[1] + j, -1).astype(np.int64)
+        n = np.minimum(np.searchsorted(self._cells, cells), len(self._cells) - 1)
+        occupied = inside & (self._cells[n] == cells)
+
+        return np.where(occupied, n, -1)
+
+
 # === BARRIER WRAPPERS ===
-def outer_barrier(func: Callable, r: float, *constraints: Callable):
+def outer_barrier(func: Callable, r: float, *constraints: Callable, context: EvaluationContext = None):
+    """
+    If every constraint has coefficients, the penalty of numeric arguments is evaluated with a ConstraintSet
+    (a ConstraintGrid, if there are many keep-out regions)
+
+    :param context: Counts the calls of the target function and of the constraints
+    """
+
+    constraint_set = _constraint_set(constraints)
+    func = _counted_target(func, context)
+
     def wrapped(*args, **kwargs):
+        _count_constraints(context, constraints, args)
+
         value = func(*args, **kwargs)
 
+        if constraint_set is not None and not kwargs and isinstance(args[0], (Real, np.ndarray)):
+            return value + r * constraint_set.penalty(*args)
+
         for constraint in constraints:
             c = constraint(*args, **kwargs)
             c = np.maximum(c, 0)
@@ -51,9 +364,213 @@ def outer_barrier(func: Callable, r: float, *constraints: Callable):
 
         return value
 
+    wrapped.context = context
+    return wrapped
+
+
+def outer_barrier_gradient(
+        gradient: Callable, r: float, *constraints: Callable, context: EvaluationContext = None
+):
+    """
+    Gradient of outer_barrier(func, r, *constraints), every constraint must have a gradient attribute
+
+    :param gradient: Gradient of the target function (called as gradient(*x))
+    """
+
+    constraint_set = _constraint_set(constraints)
+
+    def wrapped(*args):
+        _count_constraints(context, constraints, args)
+
+        value = np.array(gradient(*args), dtype=np.float64)
+
+        if constraint_set is not None:
+            return value + r * constraint_set.penalty_gradient(*args)
+
+        for constraint in constraints:
+            c = constraint(*args)
+            if c > 0:
+                value += 2 * r * c * np.asarray(constraint.gradient(*args))
+
+        return value
+
     return wrapped
 
 
+def augmented_lagrangian(
+        func: Callable, r: float, multipliers: np.ndarray, *constraints: Callable, context: EvaluationContext = None
+):
+    """
+    Augmented Lagrangian of the inequality constraints: f + r * sum(max(c + mu / 2r, 0)^2 - (mu / 2r)^2)
+
+    :param multipliers: Lagrange multipliers mu, one per constraint
+    :param context: Counts the calls of the target function and of the constraints
+    """
+
+    constraint_set = ConstraintSet(constraints) if ConstraintSet.supports(constraints) else None
+    shifts = np.asarray(multipliers, dtype=np.float64) / 2 / r
+    offset = np.sum(shifts ** 2)
+    func = _counted_target(func, context)
+
+    def wrapped(*args, **kwargs):
+        _count_constraints(context, constraints, args)
+
+        value = func(*args, **kwargs)
+
+        if constraint_set is not None and not kwargs and isinstance(args[0], (Real, np.ndarray)):
+            return value + r * (np.sum(constraint_set.violations(*args, shifts) ** 2, axis=0) - offset)
+
+        for constraint, shift in zip(constraints, shifts):
+            c = constraint(*args, **kwargs) + shift
+            c = np.maximum(c, 0)
+            value += r * (c ** 2 - shift ** 2)
+
+        return value
+
+    wrapped.context = context
+    return wrapped
+
+
+def augmented_lagrangian_gradient(
+        gradient: Callable, r: float, multipliers: np.ndarray, *constraints: Callable,
+        context: EvaluationContext = None
+):
+    """
+    Gradient of augmented_lagrangian(func, r, multipliers, *constraints),
+    every constraint must have a gradient attribute
+
+    :param gradient: Gradient of the target function (called as gradient(*x))
+    """
+
+    constraint_set = ConstraintSet(constraints) if ConstraintSet.supports(constraints) else None
+    shifts = np.asarray(multipliers, dtype=np.float64) / 2 / r
+
+    def wrapped(*args):
+        _count_constraints(context, constraints, args)
+
+        value = np.array(gradient(*args), dtype=np.float64)
+
+        if constraint_set is not None:
+            return value + r * constraint_set.penalty_gradient(*args, shifts)
+
+        for constraint, shift in zip(constraints, shifts):
+            c = constraint(*args) + shift
+            if c > 0:
+                value += 2 * r * c * np.asarray(constraint.gradient(*args))
+
+        return value
+
+    return wrapped
+
+
+class InteriorBarrier(Enum):
+    LOG = 'log'  # -r * sum(log(-c))
+    INVERSE = 'inverse'  # -r * sum(1 / c)
+
+
+def inner_barrier(
+        func: Callable, r: float, *constraints: Callable, kind: InteriorBarrier = InteriorBarrier.LOG,
+        context: EvaluationContext = None
+):
+    """
+    Interior barrier: inf outside of the feasible region (the target function is not called there).
+    If every constraint has coefficients, the result has a "max_step" attribute - max_step(x, s) is the largest
+    step from x along s that stays in the region, so line searches can keep the trial points feasible.
+
+    :param context: Counts the calls of the target function and of the constraints
+    """
+
+    constraint_set = ConstraintSet(constraints) if ConstraintSet.supports(constraints) else None
+    func = _counted_target(func, context)
+
+    def wrapped(*args, **kwargs):
+        _count_constraints(context, constraints, args)
+
+        if constraint_set is not None and not kwargs and isinstance(args[0], (Real, np.ndarray)):
+            c = constraint_set(*args)
+        else:
+            c = np.array([constraint(*args, **kwargs) for constraint in constraints])
+
+        if np.ndim(args[0]) == 0:
+            if np.any(c >= 0):
+                return np.inf
+            return func(*args, **kwargs) + r * _barrier_term(c, kind)
+
+        # Batch of points
+        feasible = np.all(c < 0, axis=0)
+        value = np.full(np.shape(feasible), np.inf)
+        if np.any(feasible):
+            value[feasible] = func(*(a[feasible] for a in np.broadcast_arrays(*args))) \
+                + r * _barrier_term(c[:, feasible], kind)
+        return value
+
+    if constraint_set is not None:
+        wrapped.max_step = constraint_set.max_step
+
+    wrapped.context = context
+    return wrapped
+
+
+def inner_barrier_gradient(
+        gradient: Callable, r: float, *constraints: Callable, kind: InteriorBarrier = InteriorBarrier.LOG,
+        context: EvaluationContext = None
+):
+    """
+    Gradient of inner_barrier(func, r, *constraints), every constraint must have a gradient attribute
+
+    :param gradient: Gradient of the target function (called as gradient(*x))
+    """
+
+    def wrapped(*args):
+        _count_constraints(context, constraints, args)
+
+        value = np.array(gradient(*args), dtype=np.float64)
+
+        for constraint in constraints:
+            c = constraint(*args)
+            if kind == InteriorBarrier.LOG:
+                value -= r / c * np.asarray(constraint.gradient(*args))
+            else:
+                value += r / c ** 2 * np.asarray(constraint.gradient(*args))
+
+        return value
+
+    return wrapped
+
+
+def _barrier_term(c, kind):
+    if kind == InteriorBarrier.LOG:
+        return -np.sum(np.log(-c), axis=0)
+    return -np.sum(1 / c, axis=0)
+
+
+def _counted_target(func, context):
+    if context is None:
+        return func
+    return context.target(func)
+
+
+def _constraint_set(constraints):
+    if ConstraintGrid.supports(constraints):
+        return ConstraintGrid(constraints)
+    if ConstraintSet.supports(constraints):
+        return ConstraintSet(constraints)
+    return None
+
+
+def _count_constraints(context, constraints, args):
+    if context is not None:
+        context.count_constraints(len(constraints) * np.size(args[0]))
+
+
+def _constraint_values(constraints, x, context=None):
+    _count_constraints(context, constraints, x)
+
+    if ConstraintSet.supports(constraints):
+        return ConstraintSet(constraints)(*x)
+    return np.array([c(*x) for c in constraints], dtype=np.float64)
+
+
 # === SEARCH ===
 def barrier_search(
         func: Callable, x0: np.array,
@@ -62,41 +579,280 @@ def barrier_search(
         r0: float, r_mult: float,
         accuracy: float,
         max_iter: int = -1,
+        gradient: Callable = None,
+        analytic_gradient: bool = False,
+        warm_start: bool = False,
+        termination_policy: TerminationPolicy = None,
+        context: EvaluationContext = None,
         output_receiver: Callable = None
 ):
-    params = deepcopy(search_params)
+    """
+    :param gradient: Explicit gradient of the target function (called as gradient(*x)). If every constraint
+        has an analytic gradient and the search method accepts one, the penalized gradient is passed to it
+    :param analytic_gradient: Pass the penalized gradient without the explicit one as well, so only the target
+        function is differentiated numerically (by default the search method differentiates the penalized function).
+        Its gradient at the solution of a round is reused when the next round starts there
+    :param warm_start: Start every round from the previous solution extrapolated along the central path
+        (x(r) - x* ~ 1/r), with the last search direction and step of the previous round
+        (if the search method accepts them)
+    :param termination_policy: Passed to the search method. Budgets (evaluations, wall-clock time) span
+        the whole search and are also checked after every round, the other policies restart in every round
+    :param context: Counts the calls of the target function and of the constraints, and the cache hits
+        (the number of target calls of every round is also reported in the output)
+    """
+
+    if context is None:
+        context = EvaluationContext()
+
+    r = r0
+
+    def penalized(target, target_gradient):
+        p_gradient = outer_barrier_gradient(target_gradient, r, *constraints, context=context) \
+            if target_gradient else None
+        return outer_barrier(target, r, *constraints, context=context), p_gradient, r
+
+    def update(x):
+        nonlocal r
+        r *= r_mult
+        return True
+
+    return _penalty_search(
+        func, x0, search_method, search_params, constraints, accuracy, max_iter,
+        gradient, analytic_gradient, termination_policy, context, output_receiver, penalized, update,
+        extrapolation=1 / r_mult if warm_start else None
+    )
+
+
+def augmented_lagrangian_search(
+        func: Callable, x0: np.array,
+        search_method: Callable, search_params: dict,
+        constraints: list[Callable],
+        r0: float, r_mult: float,
+        accuracy: float,
+        max_iter: int = -1,
+        gradient: Callable = None,
+        analytic_gradient: bool = False,
+        termination_policy: TerminationPolicy = None,
+        context: EvaluationContext = None,
+        output_receiver: Callable = None
+):
+    """
+    Augmented Lagrangian method, has the same interface as barrier_search. After every round the multipliers
+    are updated as mu = max(0, mu + 2rc(x)); r is multiplied by r_mult only if the largest violation
+    (of a constraint, or of the complementarity mu * c = 0) has not decreased at least 4 times.
+    Terminates when both the change of x and the largest violation are within accuracy.
+    """
 
-    output = []
+    if context is None:
+        context = EvaluationContext()
 
-    x_prev = x0
     r = r0
+    multipliers = np.zeros(len(constraints))
+    prev_violation = np.inf
+
+    def penalized(target, target_gradient):
+        p_gradient = augmented_lagrangian_gradient(target_gradient, r, multipliers, *constraints, context=context) \
+            if target_gradient else None
+        return augmented_lagrangian(target, r, multipliers, *constraints, context=context), p_gradient, r
+
+    def update(x):
+        nonlocal r, multipliers, prev_violation
+
+        c = _constraint_values(constraints, x, context)
+
+        # Violation of the constraints or of the complementarity of the inactive ones
+        violation = np.max(np.abs(np.maximum(c, -multipliers / 2 / r)), initial=0)
+
+        multipliers = np.maximum(0, multipliers + 2 * r * c)
+
+        if violation > prev_violation / 4:
+            r *= r_mult
+        prev_violation = violation
+
+        return violation <= accuracy
+
+    return _penalty_search(
+        func, x0, search_method, search_params, constraints, accuracy, max_iter,
+        gradient, analytic_gradient, termination_policy, context, output_receiver, penalized, update
+    )
+
+
+def interior_barrier_search(
+        func: Callable, x0: np.array,
+        search_method: Callable, search_params: dict,
+        constraints: list[Callable],
+        r0: float, r_mult: float,
+        accuracy: float,
+        max_iter: int = -1,
+        kind: InteriorBarrier = InteriorBarrier.LOG,
+        gradient: Callable = None,
+        analytic_gradient: bool = False,
+        termination_policy: TerminationPolicy = None,
+        context: EvaluationContext = None,
+        output_receiver: Callable = None
+):
+    """
+    Interior barrier method, has the same interface as barrier_search. x0 must be strictly feasible,
+    the barrier coefficient r decreases (r_mult < 1). The line searches never leave the feasible region
+    (the search method must bound them with the "max_step" attribute of the function, as fletcher_reeves,
+    lbfgs and newton do), so the target function is evaluated outside of it only by the finite-difference
+    stencils of the gradient (not at all if the gradient is given or the derivation method is DUAL).
+    """
+
+    if np.any(_constraint_values(constraints, x0) >= 0):
+        raise ValueError('Starting point must be strictly feasible')
+
+    if r_mult >= 1:
+        raise ValueError('Barrier coefficient must decrease (r_mult < 1)')
+
+    if context is None:
+        context = EvaluationContext()
+
+    r = r0
+
+    def penalized(target, target_gradient):
+        p_gradient = inner_barrier_gradient(target_gradient, r, *constraints, kind=kind, context=context) \
+            if target_gradient else None
+        return inner_barrier(target, r, *constraints, kind=kind, context=context), p_gradient, r
+
+    def update(x):
+        nonlocal r
+        r *= r_mult
+        return True
+
+    return _penalty_search(
+        func, x0, search_method, search_params, constraints, accuracy, max_iter,
+        gradient, analytic_gradient, termination_policy, context, output_receiver, penalized, update
+    )
+
+
+def _penalty_search(
+        func, x0, search_method, search_params, constraints, accuracy, max_iter,
+        gradient, analytic_gradient, termination_policy, context, output_receiver, penalized, update,
+        extrapolation=None
+):
+    """
+    Rounds of unconstrained searches, common for the penalty methods
+
+    :param penalized: penalized(target, target_gradient) - penalized function of the round, its gradient
+        (None if target_gradient is None) and the penalty coefficient to report
+    :param update: update(x) - prepares the next round, returns whether the constraints allow to terminate
+    :param extrapolation: Warm starts - ratio of the solution changes of the next and the last rounds
+        (None to start every round from the previous solution from scratch)
+    """
+
+    params = deepcopy(search_params)
+
+    parameters = signature(search_method).parameters
+
+    analytic = (gradient is not None or analytic_gradient) and 'gradient' in parameters \
+        and all(hasattr(c, 'gradient') for c in constraints)
+
+    # The penalized functions count the target calls, the search method counts the cache hits
+    if 'context' in parameters:
+        params['context'] = context
+
+    # Budgets span all the rounds; the other policies restart in every round and are not checked
+    # between the rounds, where the penalized values of different rounds are not comparable
+    outer_policy = None
+
+    if termination_policy is not None:
+        termination_policy.reset()
+        outer_policy = budgets(termination_policy)
+
+    receiver = _DelayedReceiver(output_receiver)
+
+    target = context.target(func)
+
+    target_gradient = gradient
+
+    if analytic and gradient is None:
+        # The search ends with the gradient at its solution, where the next round starts without extrapolation
+        target_gradient = CachedFunction(_target_gradient(target, params), 1, context)
+
+    x_prev = x_start = x0
 
     iter_n = 0
 
-    prev_calls = 0  # quick fix
+    prev_calls = 0
 
     while True:
-        p_func = outer_barrier(func, r, *constraints)
+        p_func, p_gradient, r = penalized(target, target_gradient if analytic else None)
 
-        output_tmp = []
+        if termination_policy is not None:
+            # The budgets see all the target calls, including the ones of the finite-difference target gradient
+            max_step = getattr(p_func, 'max_step', None)
+            p_func = ContextCountedFunction(p_func, context)
+            if max_step is not None:
+                p_func.max_step = max_step
 
-        x, f = search_method(
-            p_func, x_prev, **params,
-            output_receiver=lambda **kwargs: output_tmp.append(kwargs)
-        )
+        if analytic:
+            params['gradient'] = p_gradient
 
-        output_tmp[-1]['constraint_r'] = r
+        if termination_policy is not None:
+            params['termination_policy'] = nested(termination_policy)
 
-        output_tmp[-1]['calls'] = func.calls - prev_calls  # also quick fix
-        prev_calls = func.calls
+        x, f = search_method(p_func, x_start, **params, output_receiver=receiver)
 
-        output.extend(output_tmp)
+        # The last row of the round is held back until it is annotated
+        receiver.flush(constraint_r=r, calls=context.target_calls - prev_calls)
+        prev_calls = context.target_calls
 
-        if np.linalg.norm(x_prev - x) <= accuracy or iter_n == max_iter - 1:
-            for row in output:
-                output_receiver(**row)
+        feasible = update(x)
+
+        terminate = np.linalg.norm(x_prev - x) <= accuracy and feasible or iter_n == max_iter - 1
+
+        if outer_policy is not None and not terminate:
+            terminate = outer_policy(
+                iter_n=iter_n, x_prev=x_prev, x=x, f=f, evaluations=context.target_calls
+            )
+
+        if terminate:
             return x, f
 
+        if extrapolation is not None:
+            # Along the central path the solution changes by the same ratio every round,
+            # the first change (from x0) is not on the path
+            x_start = x + extrapolation * (x - x_prev) if iter_n > 0 else x
+
+            if receiver.s is not None and 'initial_direction' in parameters:
+                params['initial_direction'] = receiver.s
+                params['initial_lambda'] = receiver.lambda_opt
+        else:
+            x_start = x
+
         x_prev = x
-        r *= r_mult
-        iter_n += 1
\ No newline at end of file
+        iter_n += 1
+
+
+class _DelayedReceiver:
+    """
+    Passes the rows to output_receiver with a lag of one row, so the last row of a round can be annotated
+    """
+
+    def __init__(self, output_receiver: Callable):
+        self.output_receiver = output_receiver
+        self.pending = None
+        self.s = None  # the last search direction and its step, for warm starts
+        self.lambda_opt = None
+
+    def __call__(self, **row):
+        if self.pending is not None and self.output_receiver:
+            self.output_receiver(**self.pending)
+        self.pending = row
+
+        if row.get('s') is not None:
+            self.s, self.lambda_opt = row['s'], row.get('lambda_opt')
+
+    def flush(self, **annotations):
+        if self.pending is not None and self.output_receiver:
+            self.output_receiver(**self.pending, **annotations)
+        self.pending = None
+
+
+def _target_gradient(func, params):
+    grad = get_gradient_func(
+        func, None, params['derivation_method'], params['derivation_h'],
+        params.get('derivation_batched', False), params.get('derivation_executor')
+    )
+    return lambda *x: grad(np.array(x, dtype=np.float64), None)
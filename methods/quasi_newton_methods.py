@@ -0,0 +1,191 @@
+from collections import deque
+from concurrent.futures import Executor
+from typing import Callable
+
+import numpy as np
+
+from methods.derivation_methods import DerivationMethod
+from methods.evaluation import CachedFunction, EvaluationContext
+from methods.gradient_methods import TerminationCriterion, Modification, \
+    get_func_of_lambda, get_lambda_bounds, get_finite_direction, \
+    get_derivative_of_lambda, get_gradient_func, get_counted_func, check_termination
+from methods.interval_methods import sven
+from methods.termination import TerminationPolicy
+
+
+UNIT_STEP_C1 = 1e-4  # sufficient decrease parameter of the unit step
+
+
+# =======================================================================================
+def lbfgs(
+        func: Callable,
+        x0: np.ndarray,
+        derivation_method: DerivationMethod, derivation_h: float,
+        lambda_method: Callable, delta_lambda: float, lambda_accuracy: float,
+        modification: Modification, termination_criterion: TerminationCriterion, accuracy: float,
+        history_size: int = 10,
+        unit_step: bool = True,
+        restart_lambda_threshold: float = -1,
+        max_iter: int = -1,
+        derivation_batched: bool = False,
+        derivation_executor: Executor = None,
+        gradient: Callable = None,
+        cache_size: int = 0,
+        termination_policy: TerminationPolicy = None,
+        context: EvaluationContext = None,
+        output_receiver: Callable = None
+):
+    """
+    Limited-memory BFGS. Has the same signature as fletcher_reeves, so it can be used as a search_method.
+    The modification parameter is accepted for interchangeability and ignored.
+
+    :param history_size: Number of the last (x, gradient) changes used to approximate the inverse Hessian
+    :param unit_step: Try the quasi-Newton step (lambda = 1) first and accept it without the bracketing line search,
+        if it satisfies the sufficient decrease (Armijo) condition
+    """
+
+    if x0.dtype != np.float64:
+        raise Warning('Method might not work as expected if the x0 vector consists of non-floats')
+
+    max_step = getattr(func, 'max_step', None)  # feasible step length, e.g. of an interior barrier
+
+    if context is not None:
+        func = context.target(func)
+
+    func, counted = get_counted_func(func, termination_policy)
+
+    if cache_size > 0:
+        func = CachedFunction(func, cache_size, context)
+
+    grad = get_gradient_func(
+        func, gradient, derivation_method, derivation_h, derivation_batched, derivation_executor
+    )
+
+    history = deque(maxlen=history_size)
+
+    x0 = np.array(x0, dtype=np.float64)
+    x_lamb = np.empty_like(x0)
+
+    f0 = func(*x0)
+    nabla0 = grad(x0, f0)
+
+    iter_n = 0
+
+    while True:
+        s0 = -_two_loop_recursion(nabla0, history)
+
+        # Not a descent direction - drop the curvature history
+        if not np.inner(s0, nabla0) < 0:
+            history.clear()
+            s0 = -nabla0
+
+        s0 = get_finite_direction(s0, nabla0)
+        if s0 is None:  # the search cannot continue
+            if output_receiver:
+                output_receiver(iter_n=iter_n, x=x0, f=f0)
+            return x0, f0
+
+        func_lamb = get_func_of_lambda(func, x0, s0, out=x_lamb)
+
+        derivative = None
+
+        for i in range(2):
+            if getattr(lambda_method, 'inexact', False):
+                # The quasi-Newton step is 1, there is no scale for the gradient step without the history
+                derivative = get_derivative_of_lambda(grad, x0, s0)
+                lambda_opt, f1 = lambda_method(
+                    func_lamb, f0, np.inner(nabla0, s0), 1.0 if history else delta_lambda, lambda_accuracy,
+                    derivative=derivative
+                )
+                lambda_opt_x_interval = (0, lambda_opt)
+            else:
+                bounds = get_lambda_bounds(max_step, x0, s0)
+
+                # Without the history there is no scale for the gradient step
+                f1 = func_lamb(1.0) if unit_step and history and (bounds is None or bounds[1] > 1) else np.inf
+
+                if f1 <= f0 + UNIT_STEP_C1 * np.inner(nabla0, s0):
+                    lambda_opt = 1.0
+                    lambda_opt_x_interval = (0, lambda_opt)
+                else:
+                    lambda_opt_x_interval, lambda_opt_f_interval = sven(func_lamb, 0, delta_lambda, bounds=bounds)
+                    lambda_opt, f1 = lambda_method(
+                        func_lamb, lambda_opt_x_interval, lambda_opt_f_interval, lambda_accuracy
+                    )
+
+            if restart_lambda_threshold < 0 or lambda_opt > restart_lambda_threshold:
+                break
+
+            history.clear()  # "restart"
+            s0 = -nabla0
+            func_lamb = get_func_of_lambda(func, x0, s0, out=x_lamb)
+
+        if output_receiver:
+            output_receiver(
+                iter_n=iter_n,
+                x=x0.copy(),
+                f=f0,
+                nabla=nabla0,
+                s=s0,
+                lambda_interval=lambda_opt_x_interval,
+                lambda_opt=lambda_opt
+            )
+
+        x1 = x0 + lambda_opt * s0
+
+        if derivative is not None and derivative.last is not None and derivative.last[0] == lambda_opt:
+            nabla1 = derivative.last[1]  # already calculated by the line search
+        else:
+            nabla1 = grad(x1, f1)
+
+        terminate = check_termination(termination_criterion, accuracy, x0, x1, f0, f1, s0, nabla1)
+
+        if termination_policy is not None and not terminate:
+            terminate = termination_policy(
+                iter_n=iter_n, x_prev=x0, x=x1, f_prev=f0, f=f1, nabla=nabla1, s=s0, evaluations=counted.evaluations
+            )
+
+        if iter_n == max_iter:
+            terminate = True
+
+        if terminate:
+            if output_receiver:
+                if cache_size > 0:
+                    output_receiver(iter_n=iter_n+1, x=x1, f=f1, cache_hits=func.hits, cache_misses=func.misses)
+                else:
+                    output_receiver(iter_n=iter_n+1, x=x1, f=f1)
+            return x1, f1
+
+        dx = x1 - x0
+        dnabla = nabla1 - nabla0
+        curvature = np.inner(dx, dnabla)
+
+        # Keep the approximation positive definite
+        if curvature > np.finfo(np.float64).eps * np.inner(dnabla, dnabla):
+            history.append((dx, dnabla, 1 / curvature))
+
+        x0 = x1
+        f0 = f1
+        nabla0 = nabla1
+
+        iter_n += 1
+
+
+def _two_loop_recursion(nabla, history):
+    q = nabla.copy()
+    alphas = []
+
+    for dx, dnabla, rho in reversed(history):
+        alpha = rho * np.inner(dx, q)
+        q -= alpha * dnabla
+        alphas.append(alpha)
+
+    if history:
+        dx, dnabla, rho = history[-1]
+        q *= 1 / (rho * np.inner(dnabla, dnabla))
+
+    for (dx, dnabla, rho), alpha in zip(history, reversed(alphas)):
+        beta = rho * np.inner(dnabla, q)
+        q += (alpha - beta) * dx
+
+    return q
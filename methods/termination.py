@@ -0,0 +1,133 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from copy import deepcopy
+import time
+
+import numpy as np
+
+
+class TerminationPolicy(ABC):
+    """
+    Called after every iteration with the search state as keyword arguments:
+    iter_n, x_prev, x, f_prev, f, nabla, s, evaluations (any of them may be missing).
+    Returns True when the search should stop.
+    """
+
+    budget = False  # a budget spans nested searches, the other policies restart in each of them
+
+    def reset(self):
+        pass
+
+    @abstractmethod
+    def __call__(self, **state) -> bool:
+        pass
+
+
+class GradientNorm(TerminationPolicy):
+    def __init__(self, accuracy: float):
+        self.accuracy = accuracy
+
+    def __call__(self, **state) -> bool:
+        nabla = state.get('nabla')
+        return nabla is not None and np.linalg.norm(nabla) <= self.accuracy
+
+
+class Stall(TerminationPolicy):
+    """
+    Stops when the function value has decreased by no more than accuracy over the last window iterations.
+    """
+
+    def __init__(self, window: int, accuracy: float):
+        self.window = window
+        self.accuracy = accuracy
+        self._fs = deque(maxlen=window + 1)
+
+    def reset(self):
+        self._fs.clear()
+
+    def __call__(self, **state) -> bool:
+        self._fs.append(state['f'])
+        return len(self._fs) == self._fs.maxlen and self._fs[0] - self._fs[-1] <= self.accuracy
+
+
+class MaxEvaluations(TerminationPolicy):
+    budget = True
+
+    def __init__(self, limit: int):
+        self.limit = limit
+
+    def __call__(self, **state) -> bool:
+        return state.get('evaluations', 0) >= self.limit
+
+
+class Deadline(TerminationPolicy):
+    """
+    Stops when the given wall-clock time has passed since the last reset.
+    """
+
+    budget = True
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._start = time.perf_counter()
+
+    def reset(self):
+        self._start = time.perf_counter()
+
+    def __call__(self, **state) -> bool:
+        return time.perf_counter() - self._start >= self.seconds
+
+
+class AnyOf(TerminationPolicy):
+    def __init__(self, *policies: TerminationPolicy):
+        self.policies = policies
+
+    def reset(self):
+        for policy in self.policies:
+            policy.reset()
+
+    def __call__(self, **state) -> bool:
+        # Every policy sees every iteration (Stall keeps a history)
+        return any([policy(**state) for policy in self.policies])
+
+
+class Shared(TerminationPolicy):
+    """
+    Passes a policy to nested searches without resetting it, so budgets span the whole outer search.
+    """
+
+    budget = True
+
+    def __init__(self, policy: TerminationPolicy):
+        self.policy = policy
+
+    def __call__(self, **state) -> bool:
+        return self.policy(**state)
+
+
+def nested(policy: TerminationPolicy) -> TerminationPolicy:
+    """
+    :return: Policy for a nested search: the budgets are shared with the outer search, the other policies
+        (e.g. Stall, GradientNorm) are fresh copies, so the nested searches don't share their histories
+    """
+
+    if isinstance(policy, AnyOf):
+        return AnyOf(*(nested(p) for p in policy.policies))
+    if policy.budget:
+        return Shared(policy)
+
+    copy = deepcopy(policy)
+    copy.reset()
+    return copy
+
+
+def budgets(policy: TerminationPolicy) -> TerminationPolicy:
+    """
+    :return: Only the budgets of the policy (None if it has none), e.g. to check them in an outer search,
+        where the values of the nested searches are not comparable
+    """
+
+    if isinstance(policy, AnyOf):
+        parts = [p for p in (budgets(p) for p in policy.policies) if p is not None]
+        return AnyOf(*parts) if parts else None
+    return policy if policy.budget else None
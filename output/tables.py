@@ -26,7 +26,7 @@ def calls_and_deviation(results, values1, values2, subdir, filename):
             f.write('%s\t%s\n' % (v, '\t'.join(vs)))
 
 
-def penalty_method_iters(results_per_iter, subdir, filename):
+def penalty_method_iters(recorder, subdir, filename):
     dir_path = os.path.join(TABLES_DIR, subdir)
     if not os.path.exists(dir_path):
         os.makedirs(dir_path)
@@ -36,12 +36,13 @@ def penalty_method_iters(results_per_iter, subdir, filename):
         f.write('R\tx0\tx*\tf(x*)\tcalls\n')
 
         # Rows
-        for r in results_per_iter:
-            last_iter = r[-1]
+        for run in recorder.runs():
+            first_iter = recorder.row(run.start)
+            last_iter = recorder.row(run.stop - 1)
             # Values
             f.write('%i\t(%.6f; %.6f)\t(%.6f; %.6f)\t%.6f\t%i\n' % (
                 last_iter['constraint_r'],
-                r[0]['x'][0], r[0]['x'][1],
+                first_iter['x'][0], first_iter['x'][1],
                 last_iter['x'][0], last_iter['x'][1],
                 last_iter['f'],
                 last_iter['calls']
@@ -0,0 +1,113 @@
+from enum import Enum
+
+import numpy as np
+
+
+class RecordLevel(Enum):
+    NONE = 'none'
+    SUMMARY = 'summary'  # only the last row of every run
+    FULL = 'full'
+
+
+class TrajectoryRecorder:
+    """
+    Output receiver that stores search iterations in preallocated, growable NumPy columns:
+    iter_n, x, f, grad_norm and lambda_opt. A run starts with a row that has iter_n == 0
+    (e.g. every round of barrier_search is a separate run).
+    Any other keyword arguments (constraint_r, calls, ...) are kept as sparse per-row annotations,
+    except for the search direction and the lambda interval, which are not recorded.
+    """
+
+    def __init__(self, level: RecordLevel = RecordLevel.FULL, capacity: int = 64):
+        self.level = level
+        self.size = 0
+        self._capacity = capacity
+        self._iter_n = np.empty(capacity, dtype=np.int64)
+        self._x = None
+        self._f = np.empty(capacity, dtype=np.float64)
+        self._grad_norm = np.empty(capacity, dtype=np.float64)
+        self._lambda_opt = np.empty(capacity, dtype=np.float64)
+        self._run_starts = []
+        self._annotations = {}
+
+    def __call__(self, iter_n, x, f, nabla=None, lambda_opt=None, s=None, lambda_interval=None, **annotations):
+        if self.level == RecordLevel.NONE:
+            return
+
+        if self._x is None:
+            self._x = np.empty((self._capacity, len(x)), dtype=np.float64)
+
+        if iter_n == 0 or self.size == 0:
+            self._run_starts.append(self.size)
+
+        if self.level == RecordLevel.SUMMARY and iter_n != 0 and self.size > 0:
+            row = self.size - 1
+            for values in self._annotations.values():
+                values.pop(row, None)
+        else:
+            if self.size == self._capacity:
+                self._grow()
+            row = self.size
+            self.size += 1
+
+        self._iter_n[row] = iter_n
+        self._x[row] = x
+        self._f[row] = f
+        self._grad_norm[row] = np.linalg.norm(nabla) if nabla is not None else np.nan
+        self._lambda_opt[row] = lambda_opt if lambda_opt is not None else np.nan
+
+        for name, value in annotations.items():
+            self._annotations.setdefault(name, {})[row] = value
+
+    def _grow(self):
+        self._capacity *= 2
+        self._iter_n = np.resize(self._iter_n, self._capacity)
+        self._x = np.resize(self._x, (self._capacity, self._x.shape[1]))
+        self._f = np.resize(self._f, self._capacity)
+        self._grad_norm = np.resize(self._grad_norm, self._capacity)
+        self._lambda_opt = np.resize(self._lambda_opt, self._capacity)
+
+    # === COLUMNS ===
+    @property
+    def iter_n(self) -> np.ndarray:
+        return self._iter_n[:self.size]
+
+    @property
+    def x(self) -> np.ndarray:
+        if self._x is None:
+            return np.empty((0, 0), dtype=np.float64)
+        return self._x[:self.size]
+
+    @property
+    def f(self) -> np.ndarray:
+        return self._f[:self.size]
+
+    @property
+    def grad_norm(self) -> np.ndarray:
+        return self._grad_norm[:self.size]
+
+    @property
+    def lambda_opt(self) -> np.ndarray:
+        return self._lambda_opt[:self.size]
+
+    # === ROWS ===
+    def runs(self) -> list[slice]:
+        bounds = self._run_starts + [self.size]
+        return [slice(bounds[i], bounds[i + 1]) for i in range(len(self._run_starts))]
+
+    def row(self, i: int) -> dict:
+        if i < 0:
+            i += self.size
+
+        result = {'iter_n': int(self._iter_n[i]), 'x': self._x[i], 'f': self._f[i]}
+
+        if not np.isnan(self._grad_norm[i]):
+            result['grad_norm'] = self._grad_norm[i]
+        if not np.isnan(self._lambda_opt[i]):
+            result['lambda_opt'] = self._lambda_opt[i]
+
+        for name, values in self._annotations.items():
+            if i in values:
+                result[name] = values[i]
+
+        return result
@@ -5,15 +5,8 @@ import numpy as np
 
 import output.images as img
 import output.tables as tbl
-
-
-def call_counter(f):
-    def wrapped(*args, **kwargs):
-        wrapped.calls += 1
-        return f(*args, **kwargs)
-
-    wrapped.calls = 0
-    return wrapped
+from methods.evaluation import EvaluationContext
+from output.trajectory import TrajectoryRecorder, RecordLevel
 
 
 # === IMAGES ===
@@ -25,17 +18,15 @@ def image_search_path(
         pad_big_x=0.25, pad_big_y=0.25, pad_small_x=0.05, pad_small_y=0.05,
         constrained_target_x=None, constrained_target_f=None
 ):
-    output = []
+    recorder = TrajectoryRecorder()
+    context = EvaluationContext()
 
-    func.calls = 0
-    search_method(func, x0, **search_params, output_receiver=lambda **kwargs: output.append(kwargs))
+    search_method(func, x0, **search_params, context=context, output_receiver=recorder)
 
     constraints = search_params.get('constraints')
 
-    separated_output = separate_output(output)
-
     img.search_path(
-        func, real_target_x, [[r['x'] for r in i] for i in separated_output], title, subdir, filename,
+        func, real_target_x, [recorder.x[run] for run in recorder.runs()], title, subdir, filename,
         levels_n=levels_n, pixels_per_unit=pixels_per_unit,
         pad_big_x=pad_big_x, pad_big_y=pad_big_y, pad_small_x=pad_small_x, pad_small_y=pad_small_y,
         constraints=constraints, constrained_target=constrained_target_x
@@ -44,10 +35,12 @@ def image_search_path(
     # Additional console log
     message = 'Rendered path "%s" (%s)' % (title, filename)
 
-    if 'constraint_r' in output[-1]:
-        message += '. Constraint R = %.2f' % output[-1]['constraint_r']
+    last_row = recorder.row(-1)
+
+    if 'constraint_r' in last_row:
+        message += '. Constraint R = %.2f' % last_row['constraint_r']
 
-    message += '. Target function calls: %i' % func.calls
+    message += '. Target function calls: %i' % context.target_calls
 
     active_target_x = real_target_x
     if constrained_target_x is not None:
@@ -58,8 +51,8 @@ def image_search_path(
         active_target_f = constrained_target_f
 
     message += '. X deviation: %.2E. F deviation: %.2E' % (
-        np.linalg.norm(output[-1]['x'] - active_target_x),
-        np.linalg.norm(output[-1]['f'] - active_target_f)
+        np.linalg.norm(last_row['x'] - active_target_x),
+        np.linalg.norm(last_row['f'] - active_target_f)
     )
 
     print(message)
@@ -126,12 +119,12 @@ def _smart_value_to_str(v):
 
 
 def table_penalty_method_iters(func, x0, search_method, search_params, subdir, filename):
-    output = []
+    recorder = TrajectoryRecorder()
+    context = EvaluationContext()
 
-    func.calls = 0
-    search_method(func, x0, **search_params, output_receiver=lambda **kwargs: output.append(kwargs))
+    search_method(func, x0, **search_params, context=context, output_receiver=recorder)
 
-    tbl.penalty_method_iters(separate_output(output), subdir, filename)
+    tbl.penalty_method_iters(recorder, subdir, filename)
 
     # Additional console log
     message = 'Calculated table (%s). Penalty method iterations.' % filename
@@ -140,26 +133,6 @@ def table_penalty_method_iters(func, x0, search_method, search_params, subdir, f
 
 
 # === OTHER ===
-def separate_output(output):
-    separated_output = []
-
-    tmp = []
-    for row in output:
-        if len(tmp) == 0:
-            tmp.append(row)
-            continue
-
-        if row['iter_n'] == 0:
-            separated_output.append(tmp)
-            tmp = []
-
-        tmp.append(row)
-
-    separated_output.append(tmp)
-
-    return separated_output
-
-
 def feed_values_2d(
         func, x0, search_method, search_params,
         change_param1, values1, change_param2, values2,
@@ -191,7 +164,7 @@ def feed_values_1d(
     results = []
 
     for value in values:
-        output = []
+        recorder = TrajectoryRecorder(RecordLevel.SUMMARY)
 
         params = deepcopy(search_params)
 
@@ -203,14 +176,14 @@ def feed_values_1d(
                 param = param[i]
             param[change_param[-1]] = value
 
-        func.calls = 0
-        search_method(func, x0, **params, output_receiver=lambda **kwargs: output.append(kwargs))
+        context = EvaluationContext()
+        search_method(func, x0, **params, context=context, output_receiver=recorder)
 
         results.append({
-            'output': output,
-            'calls': func.calls,
-            'x_deviation': np.linalg.norm(output[-1]['x'] - real_target_x),
-            'f_deviation': np.linalg.norm(output[-1]['f'] - real_target_f)
+            'output': recorder,
+            'calls': context.target_calls,
+            'x_deviation': np.linalg.norm(recorder.x[-1] - real_target_x),
+            'f_deviation': np.linalg.norm(recorder.f[-1] - real_target_f)
         })
 
     return results
\ No newline at end of file
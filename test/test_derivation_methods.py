@@ -1,4 +1,5 @@
 import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 from methods.derivation_methods import *
 
@@ -6,6 +7,10 @@ from methods.derivation_methods import *
 ATOL = 1e-10
 
 
+def quadratic(x1, x2):
+    return x1 ** 2 + 2 * x2 ** 2
+
+
 class Test(unittest.TestCase):
 
     def test_left_difference(self):
@@ -90,3 +95,96 @@ class Test(unittest.TestCase):
         expected = np.array((der1(*x0), der2(*x0)), dtype=np.float64)
 
         self.assertTrue(np.allclose(actual, expected, atol=ATOL))
+
+    def test_batched_difference(self):
+        func = lambda x1, x2: x1 ** 2 + 2 * x2 ** 2 + np.sin(x1 * x2)
+        x0 = np.array((2, 1), dtype=np.float64)
+        h = 1e-3
+
+        for method in DerivationMethod:
+            actual = nabla(func, x0, h, method=method, batched=True)
+            expected = nabla(func, x0, h, method=method)
+
+            self.assertTrue(np.allclose(actual, expected, atol=ATOL))
+
+    def test_dual(self):
+        func = lambda x1, x2: (10 * (x1 - x2) ** 2 + (x1 - 1) ** 2) ** (1/4) + np.exp(x1) * np.sin(x2)
+        der1 = lambda x1, x2: (20 * (x1 - x2) + 2 * (x1 - 1)) / 4 * (10 * (x1 - x2) ** 2 + (x1 - 1) ** 2) ** (-3/4) \
+            + np.exp(x1) * np.sin(x2)
+        der2 = lambda x1, x2: -20 * (x1 - x2) / 4 * (10 * (x1 - x2) ** 2 + (x1 - 1) ** 2) ** (-3/4) \
+            + np.exp(x1) * np.cos(x2)
+
+        x0 = np.array((-1.2, 0.5), dtype=np.float64)
+
+        actual = nabla(func, x0, 0, method=DerivationMethod.DUAL)
+        expected = np.array((der1(*x0), der2(*x0)), dtype=np.float64)
+
+        self.assertTrue(np.allclose(actual, expected, atol=ATOL))
+
+    def test_dual_not_finite(self):
+        func = lambda x1, x2: (10 * (x1 - x2) ** 2 + (x1 - 1) ** 2) ** (1/4)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            actual = nabla(func, np.array((1, 1), dtype=np.float64), 0.1, method=DerivationMethod.DUAL)
+
+        self.assertTrue(np.all(np.isfinite(actual)))  # finite differences at the minimum of the root
+        self.assertTrue(np.allclose(actual, 0, atol=ATOL))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            actual = nabla(func, np.array((1, 1), dtype=np.float64), 0, method=DerivationMethod.DUAL)
+
+        self.assertTrue(np.all(np.isfinite(actual)))  # h is not set for DUAL, the fallback has its own step
+        self.assertTrue(np.allclose(actual, 0, atol=1e-6))
+
+    def test_richardson(self):
+        func = lambda x1, x2: x1 ** 3 + 2 * x2 ** 3
+        der1 = lambda x1, x2: 3 * x1 ** 2
+        der2 = lambda x1, x2: 6 * x2 ** 2
+
+        x0 = np.array((2, 1), dtype=np.float64)
+        h = 0.5
+
+        actual = nabla(func, x0, h, method=DerivationMethod.RICHARDSON)
+        expected = np.array((der1(*x0), der2(*x0)), dtype=np.float64)
+
+        self.assertTrue(np.allclose(actual, expected, atol=ATOL))
+
+    def test_adaptive(self):
+        func = lambda x1, x2: np.exp(x1) + np.sin(3 * x2)
+        der1 = lambda x1, x2: np.exp(x1)
+        der2 = lambda x1, x2: 3 * np.cos(3 * x2)
+
+        x0 = np.array((2, 1), dtype=np.float64)
+        expected = np.array((der1(*x0), der2(*x0)), dtype=np.float64)
+
+        for h in (1e-7, 1e-3, 1e-1):
+            actual = nabla(func, x0, h, method=DerivationMethod.ADAPTIVE)
+            self.assertTrue(np.allclose(actual, expected, atol=1e-8))
+
+    def test_executor(self):
+        x0 = np.array((2, 1), dtype=np.float64)
+        h = 1e-3
+
+        for executor_type in (ThreadPoolExecutor, ProcessPoolExecutor):
+            with executor_type(max_workers=2) as executor:
+                for method in (DerivationMethod.LEFT_DIFF, DerivationMethod.RIGHT_DIFF, DerivationMethod.SYM_DIFF):
+                    actual = nabla(quadratic, x0, h, method=method, executor=executor)
+                    expected = nabla(quadratic, x0, h, method=method)
+
+                    self.assertTrue(np.allclose(actual, expected, atol=ATOL))
+
+    def test_nabla_hessian(self):
+        func = lambda x1, x2, x3: x1 ** 2 * x2 + 3 * x2 * x3 ** 2 + x3
+        x0 = np.array((2, 1, -1), dtype=np.float64)
+
+        gradient, hessian = nabla_hessian(func, x0, 1e-3, batched=True)
+
+        expected_gradient = np.array((2 * x0[0] * x0[1], x0[0] ** 2 + 3 * x0[2] ** 2, 6 * x0[1] * x0[2] + 1))
+        expected_hessian = np.array((
+            (2 * x0[1], 2 * x0[0], 0),
+            (2 * x0[0], 0, 6 * x0[2]),
+            (0, 6 * x0[2], 6 * x0[1]),
+        ))
+
+        self.assertTrue(np.allclose(gradient, expected_gradient, atol=1e-5))
+        self.assertTrue(np.allclose(hessian, expected_hessian, atol=1e-5))
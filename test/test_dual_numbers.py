@@ -0,0 +1,37 @@
+import unittest
+
+from methods.dual_numbers import *
+
+
+ATOL = 1e-10
+
+
+class Test(unittest.TestCase):
+
+    def test_arithmetic(self):
+        func = lambda x1, x2: (3 - x1) / x2 + 2 ** x1 * x2 - abs(-x1) ** 3
+        der1 = lambda x1, x2: -1 / x2 + np.log(2) * 2 ** x1 * x2 - 3 * x1 ** 2
+        der2 = lambda x1, x2: -(3 - x1) / x2 ** 2 + 2 ** x1
+
+        x0 = np.array((1.5, 2), dtype=np.float64)
+
+        actual = dual_gradient(func, x0)
+        expected = np.array((der1(*x0), der2(*x0)), dtype=np.float64)
+
+        self.assertTrue(np.allclose(actual, expected, atol=ATOL))
+
+    def test_ufuncs(self):
+        func = lambda x1, x2: np.maximum(np.sqrt(x1) * np.log(x2), 0) + np.minimum(np.tan(x1), np.cos(x2))
+        der1 = lambda x1, x2: np.log(x2) / 2 / np.sqrt(x1)
+        der2 = lambda x1, x2: np.sqrt(x1) / x2 - np.sin(x2)
+
+        x0 = np.array((1.5, 2), dtype=np.float64)
+
+        actual = dual_gradient(func, x0)
+        expected = np.array((der1(*x0), der2(*x0)), dtype=np.float64)
+
+        self.assertTrue(np.allclose(actual, expected, atol=ATOL))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from methods.evaluation import *
+from methods.derivation_methods import DerivationMethod
+from methods.gradient_methods import fletcher_reeves, Modification, TerminationCriterion
+from methods.interval_methods import dsk_powell
+from methods.penalty_methods import barrier_search, barrier_circle
+
+
+class Test(unittest.TestCase):
+
+    def test_cached_function(self):
+        calls = []
+        func = CachedFunction(lambda x1, x2: calls.append((x1, x2)) or x1 + x2, maxsize=2)
+
+        self.assertEqual(func(1.0, 2.0), 3.0)
+        self.assertEqual(func(np.float64(1), np.float64(2)), 3.0)  # hit
+        self.assertEqual(func(2.0, 2.0), 4.0)
+        self.assertEqual(func(3.0, 2.0), 5.0)  # evicts (1, 2)
+        self.assertEqual(func(1.0, 2.0), 3.0)
+
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(func.hits, 1)
+        self.assertEqual(func.misses, 4)
+
+    def test_cached_function_arrays(self):
+        func = CachedFunction(lambda x1, x2: x1 + x2)
+
+        actual = func(np.array((1.0, 2.0)), np.array((3.0, 4.0)))
+
+        self.assertTrue(np.allclose(actual, (4.0, 6.0)))
+        self.assertEqual(func.hits + func.misses, 0)
+
+    def test_evaluation_context(self):
+        context = EvaluationContext()
+        func = context.target(lambda x1, x2: x1 + x2)
+
+        self.assertIs(context.target(func), func)  # already counted
+
+        func(1.0, 2.0)
+        func(np.arange(5.0), np.arange(5.0))  # every point of a vectorized call
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(func, range(100), range(100)))
+
+        self.assertEqual(context.target_calls, 106)
+
+        cached = CachedFunction(func, context=context)
+        cached(1.0, 2.0)
+        cached(1.0, 2.0)
+
+        self.assertEqual(context.target_calls, 107)
+        self.assertEqual(context.cache_hits, 1)
+
+    def test_counted_function_threads(self):
+        func = CountedFunction(lambda x1, x2: x1 + x2)
+
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(func, range(20000), range(20000)))
+
+        self.assertEqual(func.evaluations, 20000)
+
+    def test_unwrap(self):
+        context = EvaluationContext()
+        inner = lambda x1, x2: x1 + x2
+        func = CountedFunction(CachedFunction(context.target(inner), context=context))
+
+        self.assertIs(unwrap(func, 6), inner)
+        self.assertEqual(func.evaluations, 6)
+        self.assertEqual(context.target_calls, 6)
+
+    def test_search_context(self):
+        calls = []
+
+        def func(x1, x2):
+            calls.append((x1, x2))
+            return (x1 - 2) ** 2 + (x2 - 2) ** 2
+
+        params = {
+            'derivation_method': DerivationMethod.SYM_DIFF, 'derivation_h': 1e-4,
+            'lambda_method': dsk_powell, 'delta_lambda': 0.1, 'lambda_accuracy': 1e-6,
+            'modification': Modification.POLAK_RIBIERE,
+            'termination_criterion': TerminationCriterion.NABLA_NORM, 'accuracy': 1e-6,
+            'max_iter': 1000
+        }
+        constraints = [barrier_circle(0, 0, 1, False), barrier_circle(0, 0, 2, False)]
+
+        context = EvaluationContext()
+        fletcher_reeves(func, np.array((0, 0), dtype=np.float64), **params, cache_size=64, context=context)
+
+        self.assertEqual(context.target_calls, len(calls))
+        self.assertGreater(context.cache_hits, 0)
+
+        calls.clear()
+        context = EvaluationContext()
+        barrier_search(
+            func, np.array((0, 0), dtype=np.float64), fletcher_reeves, params,
+            constraints, 1, 10, 1e-6, max_iter=3, context=context
+        )
+
+        self.assertEqual(context.target_calls, len(calls))
+        self.assertGreater(context.constraint_calls, 0)
+        self.assertEqual(context.constraint_calls % len(constraints), 0)  # every constraint at every point
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
 import unittest
 
 from methods.gradient_methods import *
-from methods.interval_methods import dsk_powell
+from methods.evaluation import EvaluationContext
+from methods.interval_methods import dsk_powell, wolfe, armijo, grid_refinement
+from methods.termination import MaxEvaluations
 
 
 ATOL = 1e-10
@@ -32,3 +34,142 @@ class Test(unittest.TestCase):
 
         self.assertTrue(np.allclose(result_x, correct_x, atol=ATOL))  # Check x
         self.assertTrue(np.isclose(result_f, correct_f, atol=ATOL))  # Check f
+
+    def test_fletcher_reeves_gradient(self):
+        func = lambda x1, x2: 2 * x1 ** 2 + x1 * x2 + 2 * x2 ** 2 + 8 * x1
+        gradient = lambda x1, x2: (4 * x1 + x2 + 8, x1 + 4 * x2)
+
+        x0 = np.array((0, 0), dtype=np.float64)
+
+        result_x, result_f = fletcher_reeves(
+            func,
+            x0,
+            DerivationMethod.SYM_DIFF, 0.01,
+            dsk_powell, 0.1, 0.01,
+            Modification.FLETCHER_REEVES, TerminationCriterion.X_AND_F_CHANGE, 0.01,
+            gradient=gradient,
+            output_receiver=self.output
+        )
+
+        correct_x = (-32/15, 8/15)
+        correct_f = func(*correct_x)
+
+        self.assertTrue(np.allclose(result_x, correct_x, atol=ATOL))  # Check x
+        self.assertTrue(np.isclose(result_f, correct_f, atol=ATOL))  # Check f
+
+    def test_fletcher_reeves_dual(self):
+        func = lambda x1, x2: 2 * x1 ** 2 + x1 * x2 + 2 * x2 ** 2 + 8 * x1
+
+        x0 = np.array((0, 0), dtype=np.float64)
+
+        result_x, result_f = fletcher_reeves(
+            func,
+            x0,
+            DerivationMethod.DUAL, 0,
+            dsk_powell, 0.1, 0.01,
+            Modification.FLETCHER_REEVES, TerminationCriterion.X_AND_F_CHANGE, 0.01,
+            output_receiver=self.output
+        )
+
+        correct_x = (-32/15, 8/15)
+        correct_f = func(*correct_x)
+
+        self.assertTrue(np.allclose(result_x, correct_x, atol=ATOL))  # Check x
+        self.assertTrue(np.isclose(result_f, correct_f, atol=ATOL))  # Check f
+
+    def test_fletcher_reeves_wolfe(self):
+        func = lambda x1, x2: 2 * x1 ** 2 + x1 * x2 + 2 * x2 ** 2 + 8 * x1
+
+        x0 = np.array((0, 0), dtype=np.float64)
+
+        result_x, result_f = fletcher_reeves(
+            func,
+            x0,
+            DerivationMethod.SYM_DIFF, 0.01,
+            wolfe, 0.1, 1e-6,
+            Modification.POLAK_RIBIERE, TerminationCriterion.X_AND_F_CHANGE, 1e-12,
+            output_receiver=self.output
+        )
+
+        correct_x = (-32/15, 8/15)
+        correct_f = func(*correct_x)
+
+        self.assertTrue(np.allclose(result_x, correct_x, atol=1e-6))  # Check x
+        self.assertTrue(np.isclose(result_f, correct_f, atol=1e-6))  # Check f
+
+    def test_fletcher_reeves_armijo(self):
+        func = lambda x1, x2: (10 * (x1 - x2) ** 2 + (x1 - 1) ** 2) ** (1/4)
+
+        for x0 in ((-1.2, 0), (100, 0)):  # a far start needs the steps to grow
+            context = EvaluationContext()
+            result_x, result_f = fletcher_reeves(
+                func,
+                np.array(x0, dtype=np.float64),
+                DerivationMethod.SYM_DIFF, 0.1,
+                armijo, 0.31, 1e-5,
+                Modification.POLAK_RIBIERE, TerminationCriterion.X_AND_F_CHANGE, 1e-8,
+                max_iter=10000, context=context
+            )
+
+            self.assertTrue(np.allclose(result_x, (1, 1), atol=1e-4))
+            self.assertLess(context.target_calls, 2000)
+
+    def test_fletcher_reeves_vectorized_lambda(self):
+        func = lambda x1, x2: 2 * x1 ** 2 + x1 * x2 + 2 * x2 ** 2 + 8 * x1
+
+        x0 = np.array((0, 0), dtype=np.float64)
+
+        result_x, result_f = fletcher_reeves(
+            func,
+            x0,
+            DerivationMethod.SYM_DIFF, 0.01,
+            grid_refinement, 0.1, 1e-6,
+            Modification.FLETCHER_REEVES, TerminationCriterion.NABLA_NORM, 1e-6,
+            lambda_vectorized=True,
+            output_receiver=self.output
+        )
+
+        correct_x = (-32/15, 8/15)
+        correct_f = func(*correct_x)
+
+        self.assertTrue(np.allclose(result_x, correct_x, atol=1e-6))  # Check x
+        self.assertTrue(np.isclose(result_f, correct_f, atol=1e-6))  # Check f
+
+    def test_fletcher_reeves_multistart(self):
+        func = lambda x1, x2: 2 * x1 ** 2 + x1 * x2 + 2 * x2 ** 2 + 8 * x1
+
+        x0s = np.array(((0, 0), (10, -5), (-3, 2)), dtype=np.float64)
+
+        result_xs, result_fs = fletcher_reeves_multistart(
+            func,
+            x0s,
+            DerivationMethod.SYM_DIFF, 0.01,
+            0.1, 1e-6,
+            Modification.FLETCHER_REEVES, TerminationCriterion.X_AND_F_CHANGE, 1e-8,
+            output_receiver=self.output
+        )
+
+        correct_x = (-32/15, 8/15)
+        correct_f = func(*correct_x)
+
+        for result_x, result_f in zip(result_xs, result_fs):
+            self.assertTrue(np.allclose(result_x, correct_x, atol=1e-5))  # Check x
+            self.assertTrue(np.isclose(result_f, correct_f, atol=1e-5))  # Check f
+
+    def test_fletcher_reeves_max_evaluations(self):
+        func = lambda x1, x2: (10 * (x1 - x2) ** 2 + (x1 - 1) ** 2) ** (1/4)
+        calls = []
+
+        x0 = np.array((-1.2, 0), dtype=np.float64)
+
+        fletcher_reeves(
+            lambda *x: calls.append(x) or func(*x),
+            x0,
+            DerivationMethod.SYM_DIFF, 0.1,
+            dsk_powell, 0.1, 1e-5,
+            Modification.FLETCHER_REEVES, None, 0,
+            termination_policy=MaxEvaluations(50),
+            output_receiver=self.output
+        )
+
+        self.assertTrue(50 <= len(calls) < 100)
@@ -1,4 +1,6 @@
 import unittest
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 
 from numpy import isclose
 
@@ -38,6 +40,83 @@ class Test(unittest.TestCase):
             self.assertTrue(isclose(result[0][i], correct_xs[i], atol=ATOL))  # Check x
             self.assertTrue(isclose(result[1][i], correct_fs[i], atol=ATOL))  # Check f
 
+    def test_sven_expansion(self):
+        func = lambda x: (100 - x) ** 2
+        x0 = 30
+        step = 5
+
+        result = sven(func, x0, step, expansion=3)
+
+        correct_xs = (50, 95, 162.5)
+        correct_fs = tuple(func(x) for x in correct_xs)
+
+        for i in range(3):
+            self.assertTrue(isclose(result[0][i], correct_xs[i], atol=ATOL))  # Check x
+            self.assertTrue(isclose(result[1][i], correct_fs[i], atol=ATOL))  # Check f
+
+    def test_sven_bounds(self):
+        func = lambda x: (50 - x) ** 2 if x < 60 else np.inf
+        x0 = 30
+        step = 5
+
+        result = sven(func, x0, step, bounds=(-np.inf, 60))
+
+        self.assertTrue(all(x < 60 for x in result[0]))
+        self.assertTrue(all(np.isfinite(f) for f in result[1]))
+        self.assertTrue(result[1][0] > result[1][1] <= result[1][2])  # Contains the min point
+
+    def test_sven_nan(self):
+        func = lambda x: (100 - x) ** 2 if x < 60 else np.nan  # e.g. a nan search direction
+        x0 = 30
+        step = 5
+
+        result = sven(func, x0, step)
+
+        self.assertEqual(result[0][0], 45)  # Stops at the first nan value
+        self.assertTrue(np.isnan(result[1][-1]))
+
+    def test_sven_vectorized(self):
+        cases = (
+            (lambda x: (100 - x) ** 2, 30, 5),
+            (lambda x: x * (2 * x - 3), 3.5, 0.1),
+            (lambda x: (x - 1000) ** 2, 0, 0.01),  # more than one batch
+        )
+
+        for func, x0, step in cases:
+            expected = sven(func, x0, step)
+            actual = sven_vectorized(func, x0, step, count=4)
+
+            for i in range(3):
+                self.assertTrue(isclose(actual[0][i], expected[0][i]))  # Check x
+                self.assertTrue(isclose(actual[1][i], expected[1][i]))  # Check f
+
+    def test_grid_refinement(self):
+        func = lambda x: x * (2 * x - 3)
+        interval_xs = (-1.20, 0.40, 2.00)
+        interval_fs = tuple(func(x) for x in interval_xs)
+
+        actual_x, actual_f = grid_refinement(func, interval_xs, interval_fs, 1e-4)
+
+        self.assertTrue(isclose(actual_x, 0.75, atol=1e-4))  # Check x
+        self.assertTrue(isclose(func(actual_x), actual_f))
+
+    def test_grid_refinement_random(self):
+        rng = np.random.default_rng(0)
+
+        for _ in range(500):
+            a, b = np.sort(rng.uniform(-10, 10, 2))
+            c = rng.uniform(a, b)
+            points = int(rng.integers(2, 12))
+            func = lambda x: (x - c) ** 2 + 1e3  # equal values of almost coinciding points
+
+            # A known point almost on the first grid
+            m = np.clip(np.linspace(a, b, points + 2)[rng.integers(1, points + 1)] + 1e-9 * rng.normal(), a, b)
+
+            actual_x, actual_f = grid_refinement(func, (a, m, b), (func(a), func(m), func(b)), 1e-6, points=points)
+
+            self.assertTrue(isclose(actual_x, c, atol=1e-6))  # the final interval contains the min point
+            self.assertTrue(isclose(func(actual_x), actual_f))
+
     def test_golden_section(self):
         func = lambda x: x * (2 * x - 3)
         interval_xs = (-1.20, 0.40, 2.00)
@@ -52,6 +131,31 @@ class Test(unittest.TestCase):
         self.assertTrue(isclose(expected_x, actual_x, atol=ATOL))  # Check x
         self.assertTrue(isclose(expected_f, actual_f, atol=ATOL))  # Check f
 
+    def test_golden_section_max_iter(self):
+        func = lambda x: x * (2 * x - 3)
+        interval_xs = (-1.20, 0.40, 2.00)
+        interval_fs = tuple(func(x) for x in interval_xs)
+        output = []
+
+        golden_section(func, interval_xs, interval_fs, 1e-9, max_iter=5, output_receiver=lambda **kwargs: output.append(kwargs))
+
+        self.assertEqual(output[-1]['iter_n'], 5)
+        self.assertEqual(output[-1]['evaluations'], 6)
+
+    def test_fibonacci(self):
+        func = lambda x: x * (2 * x - 3)
+        interval_xs = (-1.20, 0.40, 2.00)
+        interval_fs = tuple(func(x) for x in interval_xs)
+        accuracy = 0.01
+
+        actual_x, actual_f = fibonacci(func, interval_xs, interval_fs, accuracy)
+
+        expected_x = 0.75
+        expected_f = func(expected_x)
+
+        self.assertTrue(isclose(expected_x, actual_x, atol=ATOL*2))  # Check x
+        self.assertTrue(isclose(expected_f, actual_f, atol=ATOL))  # Check f
+
     def test_dsk_powell(self):
         func = lambda x: x * (2 * x - 3)
         interval_xs = (-1.20, 0.40, 2.00)
@@ -66,6 +170,92 @@ class Test(unittest.TestCase):
         self.assertTrue(isclose(expected_x, actual_x, atol=ATOL))  # Check x
         self.assertTrue(isclose(expected_f, actual_f, atol=ATOL))  # Check f
 
+    def test_dsk_powell_degenerate(self):
+        func = lambda x: 1 - 2 * x
+        interval_xs = (0, 1, 2)
+        interval_fs = tuple(func(x) for x in interval_xs)
+
+        actual_x, actual_f = dsk_powell(func, interval_xs, interval_fs, 0.01)
+
+        self.assertEqual((actual_x, actual_f), (2, -3))  # Straight line - the best known point
+
+    def test_dsk_powell_threads(self):
+        funcs = [lambda x, c=c: (x - c) ** 2 for c in np.linspace(-1, 1, 32)]
+        filters = list(warnings.filters)
+
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(lambda f: dsk_powell(f, (-2, 0, 2), (f(-2), f(0), f(2)), 1e-6), funcs))
+
+        for (actual_x, actual_f), c in zip(results, np.linspace(-1, 1, 32)):
+            self.assertTrue(isclose(actual_x, c, atol=ATOL))  # Check x
+
+        self.assertEqual(warnings.filters, filters)
+
+    def test_brent(self):
+        func = lambda x: x * (2 * x - 3)
+        interval_xs = (-1.20, 0.40, 2.00)
+        interval_fs = tuple(func(x) for x in interval_xs)
+        accuracy = 0.01
+
+        actual_x, actual_f = brent(func, interval_xs, interval_fs, accuracy)
+
+        expected_x = 0.75
+        expected_f = func(expected_x)
+
+        self.assertTrue(isclose(expected_x, actual_x, atol=ATOL))  # Check x
+        self.assertTrue(isclose(expected_f, actual_f, atol=ATOL))  # Check f
+
+    def test_brent_non_smooth(self):
+        func = lambda x: abs(x - 0.3) ** 0.5
+        interval_xs = (-1.20, 0.40, 2.00)
+        interval_fs = tuple(func(x) for x in interval_xs)
+
+        actual_x, actual_f = brent(func, interval_xs, interval_fs, 1e-5)
+
+        self.assertTrue(isclose(actual_x, 0.3, atol=1e-5))  # Check x
+        self.assertTrue(isclose(func(actual_x), actual_f))
+
+    def test_wolfe(self):
+        func = lambda x: x * (2 * x - 3)
+        derivative = lambda x: 4 * x - 3
+        c2 = 0.1
+
+        actual_x, actual_f = wolfe(func, func(0), derivative(0), 0.1, 0.01, derivative=derivative, c2=c2)
+
+        self.assertTrue(actual_f <= func(0) + 1e-4 * actual_x * derivative(0))  # Sufficient decrease
+        self.assertTrue(abs(derivative(actual_x)) <= -c2 * derivative(0))  # Curvature
+        self.assertTrue(isclose(func(actual_x), actual_f))
+
+    def test_armijo(self):
+        func = lambda x: x * (2 * x - 3)
+        d0 = -3
+
+        actual_x, actual_f = armijo(func, func(0), d0, 10, 0.01)
+
+        self.assertTrue(isclose(actual_x, 1.25, atol=ATOL))
+        self.assertTrue(isclose(func(actual_x), actual_f))
+
+        actual_x, actual_f = armijo(func, func(0), d0, 0.01, 0.001)  # too short a step is expanded
+
+        self.assertTrue(isclose(actual_x, 0.64, atol=ATOL))
+        self.assertTrue(isclose(func(actual_x), actual_f))
+
+    def test_sven_golden_section_lockstep(self):
+        funcs = (lambda x: (100 - x) ** 2, lambda x: x * (2 * x - 3))
+        func = lambda xs, lines: np.array([funcs[i](x) for x, i in zip(xs, lines)])
+
+        xs, fs = sven_lockstep(func, np.array((30, 3.5)), np.array((5, 0.1)))
+
+        for i, (x0, step) in enumerate(((30, 5), (3.5, 0.1))):
+            correct_xs, correct_fs = sven(funcs[i], x0, step)
+            self.assertTrue(np.allclose([x[i] for x in xs], correct_xs, atol=ATOL))  # Check x
+            self.assertTrue(np.allclose([f[i] for f in fs], correct_fs, atol=ATOL))  # Check f
+
+        actual_x, actual_f = golden_section_lockstep(func, xs, fs, 0.01)
+
+        self.assertTrue(np.allclose(actual_x, (100, 0.75), atol=0.01))
+        self.assertTrue(np.allclose(actual_f, (0, -1.125), atol=ATOL))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
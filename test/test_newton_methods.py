@@ -0,0 +1,83 @@
+import unittest
+
+from methods.newton_methods import *
+from methods.evaluation import EvaluationContext
+from methods.interval_methods import dsk_powell, wolfe
+
+
+ATOL = 1e-6
+
+
+class Test(unittest.TestCase):
+
+    @staticmethod
+    def output(**kwargs):
+        print(kwargs)
+
+    def test_newton(self):
+        func = lambda x1, x2: 2 * x1 ** 2 + x1 * x2 + 2 * x2 ** 2 + 8 * x1
+
+        x0 = np.array((0, 0), dtype=np.float64)
+
+        result_x, result_f = newton(
+            func,
+            x0,
+            DerivationMethod.SYM_DIFF, 0.01,
+            dsk_powell, 0.1, 1e-5,
+            None, TerminationCriterion.NABLA_NORM, 1e-8,
+            output_receiver=self.output
+        )
+
+        correct_x = (-32/15, 8/15)
+        correct_f = func(*correct_x)
+
+        self.assertTrue(np.allclose(result_x, correct_x, atol=ATOL))  # Check x
+        self.assertTrue(np.isclose(result_f, correct_f, atol=ATOL))  # Check f
+
+        for derivation_batched in (True, False):
+            self.assertTrue(np.allclose(newton(
+                func, x0, DerivationMethod.SYM_DIFF, 0.01, dsk_powell, 0.1, 1e-5,
+                None, TerminationCriterion.NABLA_NORM, 1e-8, derivation_batched=derivation_batched
+            )[0], correct_x, atol=ATOL))
+
+        with self.assertRaises(ValueError):  # the Hessian stencil is symmetric
+            newton(
+                func, x0, DerivationMethod.DUAL, 0.01, dsk_powell, 0.1, 1e-5,
+                None, TerminationCriterion.NABLA_NORM, 1e-8
+            )
+
+    def test_newton_wolfe(self):
+        func = lambda x1, x2, x3: (x1 - 1) ** 2 + 2 * (x2 + 1) ** 2 + 3 * x3 ** 2 + x1 * x3
+
+        context = EvaluationContext()
+        result_x, result_f = newton(
+            func,
+            np.zeros(3),
+            DerivationMethod.SYM_DIFF, 0.01,
+            wolfe, 0.1, 1e-5,
+            None, TerminationCriterion.NABLA_NORM, 1e-6,
+            context=context
+        )
+
+        self.assertTrue(np.allclose(result_x, (12/11, -1, -2/11), atol=ATOL))
+        # f(x0), the Hessian stencils (2n^2 points) at x0 and x1 and a single Wolfe trial with its gradient (2n),
+        # the Hessian stencil is not evaluated at the trial point
+        self.assertEqual(context.target_calls, 1 + 18 + (1 + 6) + 18)
+
+    def test_modified_newton(self):
+        func = lambda x1, x2: 100 * (x2 - x1 ** 2) ** 2 + (1 - x1) ** 2
+
+        x0 = np.array((-1.2, 1), dtype=np.float64)
+
+        for modified in (False, True):
+            result_x, result_f = newton(
+                func,
+                x0,
+                DerivationMethod.SYM_DIFF, 1e-4,
+                dsk_powell, 0.1, 1e-8,
+                None, TerminationCriterion.NABLA_NORM, 1e-6,
+                modified=modified,
+                max_iter=1000
+            )
+
+            self.assertTrue(np.allclose(result_x, (1, 1), atol=1e-4))  # Check x
@@ -0,0 +1,353 @@
+import unittest
+
+from methods.penalty_methods import *
+from methods.derivation_methods import nabla, DerivationMethod
+from methods.evaluation import CountedFunction, EvaluationContext
+from methods.gradient_methods import fletcher_reeves, Modification, TerminationCriterion
+from methods.interval_methods import dsk_powell
+from methods.newton_methods import newton
+from methods.quasi_newton_methods import lbfgs
+from methods.termination import Stall, MaxEvaluations, AnyOf
+
+
+ATOL = 1e-10
+
+QUADRATIC_PARAMS = {
+    'derivation_method': DerivationMethod.SYM_DIFF, 'derivation_h': 1e-4,
+    'lambda_method': dsk_powell, 'delta_lambda': 0.1, 'lambda_accuracy': 1e-6,
+    'modification': Modification.POLAK_RIBIERE,
+    'termination_criterion': TerminationCriterion.NABLA_NORM, 'accuracy': 1e-6,
+    'max_iter': 1000
+}
+
+ROOT_PARAMS = {
+    'derivation_method': DerivationMethod.SYM_DIFF, 'derivation_h': 0.1,
+    'lambda_method': dsk_powell, 'delta_lambda': 0.31, 'lambda_accuracy': 1e-4,
+    'modification': Modification.POLAK_RIBIERE,
+    'termination_criterion': TerminationCriterion.X_AND_F_CHANGE, 'accuracy': 1e-4,
+    'max_iter': 10000
+}
+
+
+def root_func(x1, x2):
+    return (10 * (x1 - x2) ** 2 + (x1 - 1) ** 2) ** (1/4)
+
+
+class Test(unittest.TestCase):
+
+    def test_barrier_line(self):
+        barrier = barrier_line(1, 2, 45, False)
+
+        self.assertTrue(np.isclose(barrier(1, 2), 0, atol=ATOL))  # On the line
+        self.assertTrue(np.isclose(barrier(3, 4), 0, atol=ATOL))  # On the line
+        self.assertTrue(barrier(1, 3) < 0)  # Above the line
+
+    def test_constraint_set(self):
+        constraints = [
+            barrier_circle(0.25, 0.4, 0.7, False),
+            barrier_ellipse(0.25, 0, 0.4, 0.7, 30, True),
+            barrier_line(0, 1, 60, False),
+            barrier_line(-1, 0, 90, True),
+        ]
+        constraint_set = ConstraintSet(constraints)
+
+        x1 = np.linspace(-2, 2, 7)
+        x2 = np.linspace(-1, 3, 7)
+
+        expected = np.array([[c(a, b) for a, b in zip(x1, x2)] for c in constraints])
+
+        self.assertTrue(np.allclose(constraint_set(x1, x2), expected, atol=ATOL))  # Batch
+        self.assertTrue(np.allclose(constraint_set(x1[0], x2[0]), expected[:, 0], atol=ATOL))  # Single point
+        self.assertTrue(np.allclose(
+            constraint_set.penalty(x1, x2), np.sum(np.maximum(expected, 0) ** 2, axis=0), atol=ATOL
+        ))
+
+    def test_constraint_grid(self):
+        rng = np.random.default_rng(0)
+        constraints = [barrier_circle(0, 0, 12, False)]  # keep-in region, checked everywhere
+        for i in range(60):
+            x, y = rng.uniform(-10, 10, 2)
+            if i % 2:
+                constraints.append(barrier_circle(x, y, rng.uniform(0.2, 1.5), True))
+            else:
+                constraints.append(barrier_ellipse(x, y, rng.uniform(0.2, 1.5), 0.5, rng.uniform(0, 180), True))
+
+        self.assertTrue(ConstraintGrid.supports(constraints))
+        self.assertFalse(ConstraintGrid.supports(constraints[:10]))
+
+        constraint_set = ConstraintSet(constraints)
+        grid = ConstraintGrid(constraints)
+
+        x1, x2 = rng.uniform(-13, 13, (2, 500))
+
+        self.assertTrue(np.allclose(grid.penalty(x1, x2), constraint_set.penalty(x1, x2), atol=ATOL))  # Batch
+        self.assertTrue(np.allclose(
+            grid.penalty_gradient(x1, x2), constraint_set.penalty_gradient(x1, x2), atol=ATOL
+        ))
+        for a, b in zip(x1[:50], x2[:50]):  # Single points
+            self.assertTrue(np.isclose(grid.penalty(a, b), constraint_set.penalty(a, b), atol=ATOL))
+            self.assertTrue(np.allclose(grid.penalty_gradient(a, b), constraint_set.penalty_gradient(a, b), atol=ATOL))
+
+            # Every violated keep-out region is a candidate, most of the others are not
+            violated = np.flatnonzero(constraint_set(a, b)[1:] > 0)
+            self.assertTrue(set(violated) <= set(grid.candidates(a, b)))
+            self.assertLess(len(grid.candidates(a, b)), 20)
+
+    def test_outer_barrier(self):
+        func = lambda x1, x2: x1 ** 2 + x2 ** 2
+        constraints = [barrier_circle(0.25, 0.4, 0.7, False), barrier_ellipse(0.25, 0, 0.4, 0.7, 0, True)]
+
+        packed = outer_barrier(func, 10, *constraints)
+        looped = outer_barrier(func, 10, *constraints, lambda x1, x2: -1)  # no coefficients
+
+        for point in ((0, 0), (1, 1), (-0.5, 0.3)):
+            self.assertTrue(np.isclose(packed(*point), looped(*point), atol=ATOL))
+
+        keep_out = [barrier_circle(x / 4, y / 4, 0.2, True) for x in range(-4, 4) for y in range(-4, 4)]
+        gridded = outer_barrier(func, 10, *keep_out)
+        looped = outer_barrier(func, 10, *keep_out, lambda x1, x2: -1)
+
+        for point in ((0, 0), (0.3, -0.1), (-0.6, 0.55), (5, 5)):
+            self.assertTrue(np.isclose(gridded(*point), looped(*point), atol=ATOL))
+
+    def test_outer_barrier_gradient(self):
+        func = lambda x1, x2: x1 ** 2 + x2 ** 2
+        gradient = lambda x1, x2: (2 * x1, 2 * x2)
+        constraints = [barrier_circle(0.25, 0.4, 0.7, False), barrier_line(0, 1, 60, False)]
+
+        for extra in ((), (_with_gradient(lambda x1, x2: x1 - 2, (1, 0)),)):  # packed and looped
+            p_func = outer_barrier(func, 10, *constraints, *extra)
+            p_gradient = outer_barrier_gradient(gradient, 10, *constraints, *extra)
+
+            for point in ((0, 0), (3, 1), (-0.5, 1.3)):
+                h = 1e-6
+                expected = (
+                    (p_func(point[0] + h, point[1]) - p_func(point[0] - h, point[1])) / 2 / h,
+                    (p_func(point[0], point[1] + h) - p_func(point[0], point[1] - h)) / 2 / h,
+                )
+                self.assertTrue(np.allclose(p_gradient(*point), expected, atol=1e-5))
+
+    def test_barrier_search_gradient(self):
+        func = lambda x1, x2: (x1 - 2) ** 2 + (x2 - 2) ** 2
+        gradient = lambda x1, x2: (2 * (x1 - 2), 2 * (x2 - 2))
+
+        x, f = barrier_search(
+            func, np.array((0, 0), dtype=np.float64), fletcher_reeves, QUADRATIC_PARAMS,
+            [barrier_circle(0, 0, 1, False)], 1, 10, 1e-6, max_iter=6,
+            gradient=gradient, output_receiver=lambda **kwargs: None
+        )
+
+        self.assertTrue(np.allclose(x, (np.sqrt(0.5), np.sqrt(0.5)), atol=1e-4))
+
+    def test_barrier_search_warm_start(self):
+        results = []
+        for warm_start in (False, True):
+            context = EvaluationContext()
+            x, f = barrier_search(
+                root_func, np.array((-1.2, 0), dtype=np.float64), fletcher_reeves, ROOT_PARAMS,
+                [barrier_circle(0.25, 0.4, 0.7, False)], 1, 10, 1e-4, max_iter=12,
+                analytic_gradient=True, warm_start=warm_start, context=context
+            )
+            results.append((x, context.target_calls))
+
+        (x_cold, calls_cold), (x_warm, calls_warm) = results
+
+        self.assertTrue(np.allclose(x_warm, (0.817485, 0.809831), atol=2e-3))
+        self.assertTrue(np.allclose(x_warm, x_cold, atol=2e-3))
+        self.assertLess(calls_warm, calls_cold)
+
+    def test_barrier_search_gradient_reuse(self):
+        output = []
+        context = EvaluationContext()
+        x, f = barrier_search(
+            root_func, np.array((-1.2, 0), dtype=np.float64), fletcher_reeves, ROOT_PARAMS,
+            [barrier_circle(0.25, 0.4, 0.7, False)], 1, 10, 1e-4, max_iter=12,
+            analytic_gradient=True, context=context, output_receiver=lambda **row: output.append(row)
+        )
+
+        # Every round after the first starts with the target gradient at the solution of the previous one
+        rounds = sum('constraint_r' in row for row in output)
+        self.assertEqual(context.cache_hits, rounds - 1)
+
+    def test_barrier_search_termination_policy(self):
+        def search(policy):
+            context = EvaluationContext()
+            x, f = barrier_search(
+                root_func, np.array((-1.2, 0), dtype=np.float64), fletcher_reeves, ROOT_PARAMS,
+                [barrier_circle(0.25, 0.4, 0.7, False)], 1, 10, 1e-4, max_iter=12,
+                analytic_gradient=True, termination_policy=policy, context=context
+            )
+            return x, context.target_calls
+
+        x_free, calls_free = search(None)
+
+        # The penalized f jumps up when r grows, a Stall history shared between the rounds would stop the search
+        x, calls = search(Stall(5, 1e-9))
+        self.assertTrue(np.allclose(x, x_free, atol=1e-6))
+        self.assertEqual(calls, calls_free)
+
+        # Budgets still span all the rounds
+        x, calls = search(AnyOf(Stall(5, 1e-9), MaxEvaluations(200)))
+        self.assertLess(calls, calls_free)
+        self.assertLess(calls, 260)
+
+        # The calls of the finite-difference target gradient count towards the budget as well
+        for limit in (50, 100):
+            x, calls = search(MaxEvaluations(limit))
+            self.assertLess(calls, limit * 1.15)
+
+    def test_augmented_lagrangian_gradient(self):
+        func = lambda x1, x2: x1 ** 2 + x2 ** 2
+        gradient = lambda x1, x2: (2 * x1, 2 * x2)
+        constraints = [barrier_circle(0.25, 0.4, 0.7, False), barrier_line(0, 1, 60, False)]
+        multipliers = np.array((0.5, 2))
+
+        for extra, extra_multipliers in (((), ()), ((_with_gradient(lambda x1, x2: x1 - 2, (1, 0)),), (1,))):
+            m = np.concatenate((multipliers, extra_multipliers))
+            p_func = augmented_lagrangian(func, 10, m, *constraints, *extra)
+            p_gradient = augmented_lagrangian_gradient(gradient, 10, m, *constraints, *extra)
+
+            for point in ((0, 0), (3, 1), (-0.5, 1.3)):
+                h = 1e-6
+                expected = (
+                    (p_func(point[0] + h, point[1]) - p_func(point[0] - h, point[1])) / 2 / h,
+                    (p_func(point[0], point[1] + h) - p_func(point[0], point[1] - h)) / 2 / h,
+                )
+                self.assertTrue(np.allclose(p_gradient(*point), expected, atol=1e-5))
+
+    def test_augmented_lagrangian_search(self):
+        func = lambda x1, x2: (x1 - 2) ** 2 + (x2 - 2) ** 2
+
+        output = []
+
+        x, f = augmented_lagrangian_search(
+            func, np.array((0, 0), dtype=np.float64), fletcher_reeves, QUADRATIC_PARAMS,
+            [barrier_circle(0, 0, 1, False)], 1, 10, 1e-6, max_iter=20,
+            output_receiver=lambda **kwargs: output.append(kwargs)
+        )
+
+        self.assertTrue(np.allclose(x, (np.sqrt(0.5), np.sqrt(0.5)), atol=1e-5))
+        self.assertTrue(sum('constraint_r' in row for row in output) < 10)  # Rounds
+
+    def test_inner_barrier(self):
+        calls = []
+        func = lambda x1, x2: calls.append((x1, x2)) or x1 + x2
+        constraints = [barrier_circle(0, 0, 1, False), barrier_line(0, 0.5, 0, False)]
+        p_func = inner_barrier(func, 0.1, *constraints)
+
+        self.assertEqual(p_func(0, 0), np.inf)  # Infeasible
+        self.assertEqual(p_func(0, 0.5), np.inf)  # On the boundary
+        self.assertEqual(len(calls), 0)
+
+        self.assertTrue(np.isclose(p_func(0, 0.75), 0.75 - 0.1 * (np.log(1 - 0.75 ** 2) + np.log(0.25))))
+
+        values = p_func(np.array((0, 0, 0.1)), np.array((0, 0.75, 0.75)))  # Batch
+        self.assertEqual(values[0], np.inf)
+        self.assertTrue(np.isclose(values[1], p_func(0, 0.75)))
+        self.assertEqual(len(calls), 3)
+
+        x, s = np.array((0, 0.75)), np.array((1, 0))
+        step = p_func.max_step(x, s)
+        self.assertTrue(np.isclose(step, np.sqrt(1 - 0.75 ** 2)))
+        self.assertEqual(p_func(*(x + step * 1.001 * s)), np.inf)
+
+    def test_inner_barrier_dual(self):
+        func = lambda x1, x2: (x1 - 2) ** 2 + x2 ** 2
+        constraints = [barrier_circle(0, 0, 1, False), barrier_line(0, 0.5, 0, False)]
+        x = np.array((0.1, 0.75))
+
+        for kind in InteriorBarrier:
+            p_func = inner_barrier(func, 0.1, *constraints, kind=kind)
+            expected = nabla(p_func, x, 1e-6, DerivationMethod.SYM_DIFF)
+            actual = nabla(p_func, x, 1e-6, DerivationMethod.DUAL)
+            self.assertTrue(np.allclose(actual, expected, atol=1e-6))
+
+    def test_interior_barrier_search(self):
+        constraints = [barrier_circle(0, 0, 1, False)]
+        outside = []
+
+        def func(x1, x2):
+            if constraints[0](x1, x2) > 0:
+                outside.append((x1, x2))
+            return (x1 - 2) ** 2 + (x2 - 2) ** 2
+
+        gradient = lambda x1, x2: (2 * (x1 - 2), 2 * (x2 - 2))
+
+        params = {**QUADRATIC_PARAMS, 'lambda_accuracy': 1e-8}
+
+        for kind in InteriorBarrier:
+            outside.clear()
+
+            x, f = interior_barrier_search(
+                func, np.array((0, 0), dtype=np.float64), fletcher_reeves, params,
+                constraints, 1, 0.1, 1e-6, max_iter=8, kind=kind,
+                gradient=gradient, output_receiver=lambda **kwargs: None
+            )
+
+            self.assertTrue(np.allclose(x, (np.sqrt(0.5), np.sqrt(0.5)), atol=1e-3))
+            self.assertTrue(constraints[0](*x) < 0)
+            self.assertEqual(len(outside), 0)
+
+        with self.assertRaises(ValueError):
+            interior_barrier_search(
+                func, np.array((2, 2), dtype=np.float64), fletcher_reeves, params,
+                constraints, 1, 0.1, 1e-6
+            )
+
+    def test_interior_barrier_search_methods(self):
+        constraints = [barrier_circle(0, 0, 1, False)]
+        outside = []
+
+        def func(x1, x2):
+            outside.extend(np.flatnonzero(np.atleast_1d(constraints[0](x1, x2) > 0)))
+            return (x1 - 2) ** 2 + (x2 - 2) ** 2
+
+        gradient = lambda x1, x2: (2 * (x1 - 2), 2 * (x2 - 2))
+
+        # The Hessian stencil of the largest step leaves the region near the boundary, newton stops there
+        for search_method, h, atol in ((lbfgs, 1e-4, 1e-3), (newton, 1e-4, 1e-3), (newton, 0.1, 0.05)):
+            params = {**QUADRATIC_PARAMS, 'derivation_h': h, 'lambda_accuracy': 1e-8, 'max_iter': 50}
+
+            for kind in InteriorBarrier:
+                outside.clear()
+
+                x, f = interior_barrier_search(
+                    func, np.array((0, 0), dtype=np.float64), search_method, params,
+                    constraints, 1, 0.1, 1e-6, max_iter=8, kind=kind, gradient=gradient
+                )
+
+                self.assertTrue(np.allclose(x, (np.sqrt(0.5), np.sqrt(0.5)), atol=atol))
+                self.assertTrue(constraints[0](*x) < 0)
+                self.assertEqual(len(outside), 0)
+
+    def test_barrier_search_streaming(self):
+        rounds = []
+        func = CountedFunction(lambda x1, x2: (x1 - 2) ** 2 + (x2 - 2) ** 2)
+
+        def search_method(p_func, x0, output_receiver, **params):
+            rounds.append(len(output))  # rows of the previous rounds are already received
+            return fletcher_reeves(p_func, x0, **params, output_receiver=output_receiver)
+
+        output = []
+
+        barrier_search(
+            func, np.array((0, 0), dtype=np.float64), search_method, QUADRATIC_PARAMS,
+            [barrier_circle(0, 0, 1, False)], 1, 10, 1e-6, max_iter=4,
+            output_receiver=lambda **kwargs: output.append(kwargs)
+        )
+
+        self.assertEqual(len(rounds), 4)
+        self.assertTrue(all(a < b for a, b in zip(rounds, rounds[1:])))  # Streamed between the rounds
+
+        annotated = [i for i, row in enumerate(output) if 'constraint_r' in row]
+        self.assertEqual(annotated, [n - 1 for n in rounds[1:]] + [len(output) - 1])  # Last row of every round
+        self.assertEqual(sum(output[i]['calls'] for i in annotated), func.evaluations)
+
+        barrier_search(  # no receiver
+            func, np.array((0, 0), dtype=np.float64), fletcher_reeves, QUADRATIC_PARAMS,
+            [barrier_circle(0, 0, 1, False)], 1, 10, 1e-6, max_iter=2
+        )
+
+def _with_gradient(constraint, gradient):
+    constraint.gradient = lambda x1, x2: np.array(gradient, dtype=np.float64)
+    return constraint
@@ -0,0 +1,80 @@
+import unittest
+
+from methods.quasi_newton_methods import *
+from methods.evaluation import EvaluationContext
+from methods.gradient_methods import fletcher_reeves
+from methods.interval_methods import dsk_powell, wolfe, armijo
+
+
+ATOL = 1e-6
+
+
+class Test(unittest.TestCase):
+
+    @staticmethod
+    def output(**kwargs):
+        print(kwargs)
+
+    def test_lbfgs(self):
+        func = lambda x1, x2, x3: 2 * x1 ** 2 + x1 * x2 + 2 * x2 ** 2 + 8 * x1 + (x3 - 1) ** 2
+
+        x0 = np.array((0, 0, 0), dtype=np.float64)
+
+        result_x, result_f = lbfgs(
+            func,
+            x0,
+            DerivationMethod.SYM_DIFF, 0.01,
+            dsk_powell, 0.1, 1e-5,
+            None, TerminationCriterion.X_AND_F_CHANGE, 1e-10,
+            history_size=2,
+            output_receiver=self.output
+        )
+
+        correct_x = (-32/15, 8/15, 1)
+        correct_f = func(*correct_x)
+
+        self.assertTrue(np.allclose(result_x, correct_x, atol=ATOL))  # Check x
+        self.assertTrue(np.isclose(result_f, correct_f, atol=ATOL))  # Check f
+
+    def test_lbfgs_root(self):
+        func = lambda x1, x2: (10 * (x1 - x2) ** 2 + (x1 - 1) ** 2) ** (1/4)
+
+        for x0 in ((-1.2, 0), (100, 0), (10, -10), (0, 5)):
+            calls = []
+
+            for search_method in (lbfgs, fletcher_reeves):
+                context = EvaluationContext()
+                result_x, result_f = search_method(
+                    func,
+                    np.array(x0, dtype=np.float64),
+                    DerivationMethod.SYM_DIFF, 0.1,
+                    dsk_powell, 0.31, 1e-5,
+                    Modification.POLAK_RIBIERE, TerminationCriterion.X_AND_F_CHANGE, 1e-8,
+                    max_iter=10000, context=context
+                )
+
+                self.assertTrue(np.allclose(result_x, (1, 1), atol=ATOL))  # Check x
+                calls.append(context.target_calls)
+
+            self.assertLess(calls[0], 0.75 * calls[1])  # the unit steps need no line search
+
+    def test_lbfgs_inexact(self):
+        func = lambda x1, x2, x3: 2 * x1 ** 2 + x1 * x2 + 2 * x2 ** 2 + 8 * x1 + (x3 - 1) ** 2
+
+        x0 = np.array((0, 0, 0), dtype=np.float64)
+
+        for lambda_method in (wolfe, armijo):
+            result_x, result_f = lbfgs(
+                func,
+                x0,
+                DerivationMethod.SYM_DIFF, 0.01,
+                lambda_method, 0.1, 1e-5,
+                None, TerminationCriterion.X_AND_F_CHANGE, 1e-10,
+                history_size=2
+            )
+
+            self.assertTrue(np.allclose(result_x, (-32/15, 8/15, 1), atol=ATOL))  # Check x
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+
+from methods.termination import *
+
+
+class Test(unittest.TestCase):
+
+    def test_gradient_norm(self):
+        policy = GradientNorm(1e-3)
+
+        self.assertFalse(policy(nabla=np.array((1e-3, 1e-3))))
+        self.assertTrue(policy(nabla=np.array((1e-4, 1e-4))))
+        self.assertFalse(policy(f=0))
+
+    def test_stall(self):
+        policy = Stall(2, 1e-3)
+
+        self.assertFalse(policy(f=1))
+        self.assertFalse(policy(f=0.5))
+        self.assertFalse(policy(f=0.4995))
+        self.assertTrue(policy(f=0.4991))
+
+        policy.reset()
+        self.assertFalse(policy(f=0.4991))
+
+    def test_any_of(self):
+        policy = AnyOf(MaxEvaluations(100), Deadline(3600))
+
+        self.assertFalse(policy(evaluations=99))
+        self.assertTrue(policy(evaluations=100))
+        self.assertTrue(AnyOf(Deadline(0))(evaluations=0))
+
+        with self.assertRaises(TypeError):
+            TerminationPolicy()  # abstract
+
+    def test_nested(self):
+        stall, budget = Stall(2, 1e-3), MaxEvaluations(100)
+        policy = AnyOf(stall, budget)
+
+        inner = nested(policy)
+        inner.reset()  # as a nested search does
+        self.assertFalse(inner(f=1, evaluations=0))
+        self.assertTrue(inner(f=1, evaluations=100))  # the budget is shared
+        self.assertEqual(len(stall._fs), 0)  # the history is not
+
+        self.assertIs(budgets(policy).policies[0], budget)
+        self.assertIsNone(budgets(stall))
+
+
+if __name__ == '__main__':
+    unittest.main()
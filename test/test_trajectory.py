@@ -0,0 +1,46 @@
+import unittest
+
+import numpy as np
+
+from output.trajectory import *
+
+
+class Test(unittest.TestCase):
+
+    @staticmethod
+    def feed(recorder):
+        for run in range(2):
+            for i in range(100):
+                recorder(iter_n=i, x=np.array((i, run), dtype=np.float64), f=i * 0.5, nabla=np.array((3, 4)),
+                         s=np.array((1, 1)), lambda_opt=0.1)
+            recorder(iter_n=100, x=np.array((100, run), dtype=np.float64), f=50, constraint_r=10 ** run)
+
+    def test_full(self):
+        recorder = TrajectoryRecorder(RecordLevel.FULL, capacity=4)
+        self.feed(recorder)
+
+        self.assertEqual(recorder.size, 202)
+        self.assertEqual([(r.start, r.stop) for r in recorder.runs()], [(0, 101), (101, 202)])
+        self.assertTrue(np.array_equal(recorder.x[150], (49, 1)))
+        self.assertTrue(np.allclose(recorder.grad_norm[:100], 5))
+        self.assertTrue(np.isnan(recorder.lambda_opt[100]))
+        self.assertEqual(recorder.row(-1)['constraint_r'], 10)
+        self.assertNotIn('constraint_r', recorder.row(-2))
+
+    def test_summary(self):
+        recorder = TrajectoryRecorder(RecordLevel.SUMMARY)
+        self.feed(recorder)
+
+        self.assertEqual(recorder.size, 2)
+        self.assertTrue(np.array_equal(recorder.x, ((100, 0), (100, 1))))
+        self.assertEqual(recorder.row(0)['constraint_r'], 1)
+
+    def test_none(self):
+        recorder = TrajectoryRecorder(RecordLevel.NONE)
+        self.feed(recorder)
+
+        self.assertEqual(recorder.size, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()